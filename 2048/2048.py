@@ -1,11 +1,14 @@
 import tkinter as tk
-import random
-import math
 from pathlib import Path
 from lib.aspect import Tk_aspect
+from lib.board import Board2048, DIRECTIONS
+from lib.view import CanvasBoard
 
 FONT = 'Helvetica'
 
+MODEL = 'ntuple.npy'
+AUTO_MS = 50
+
 """
 DB structure
 
@@ -32,7 +35,7 @@ def db_to_int(upper, lower):
 
 class Game2048:
     def __init__(self, db):
-        width, height, geo_x, geo_y, self.score, board = db_to_data(db)
+        width, height, geo_x, geo_y, score, board = db_to_data(db)
 
         self.window = Tk_aspect(10, 12, geo_x, geo_y, width, height, self.size_change)
         self.window.title('2048')
@@ -40,98 +43,85 @@ class Game2048:
         self.reset_btn = tk.Button(self.window, command=self.reset, text='RESET', font=(FONT, 14))
         self.reset_btn.place(relx=1/3, relwidth=1/3, relheight=1/12)
 
-        self.board = [[board[i*4+j] for j in range(4)] for i in range(4)]
+        self.game = Board2048(board, score)
 
-        self.label = [[0]*4 for _ in range(4)]
-        for i in range(4):
-            for j in range(4):
-                self.label[i][j] = tk.Label(self.window, font=(FONT, 20))
-                self.label[i][j].place(relx=j/4, rely=1/12 + i*5/24, relwidth=1/4, relheight=5/24)
+        self.view = CanvasBoard(self.window, FONT)
+        self.view.place(rely=1/12, relwidth=1, relheight=5/6)
 
         self.score_label = tk.Label(self.window, font=(FONT, 14))
         self.score_label.place(rely=10/11, relwidth=1, relheight=1/12)
 
-        if not any(board):
-            self.add_random_tile()
-            self.add_random_tile()
-
         self.update_ui()
 
+        self.model = None
+        self.auto = None
+
         self.window.bind('<Key>', self.key_pressed)
         self.window.bind('<Escape>', self.close_game)
         self.window.bind('<Tab>', self.close_game)
         self.window.bind('<Alt_L>', self.close_game)
         self.window.protocol('WM_DELETE_WINDOW', self.close_game)
 
-    def add_random_tile(self):
-        empty_cells = [(i, j) for i in range(4) for j in range(4) if self.board[i][j] == 0]
-        if empty_cells:
-            i, j = random.choice(empty_cells)
-            self.board[i][j] = 2 if random.random() < 0.9 else 4
-
     def update_ui(self):
-        for i in range(4):
-            for j in range(4):
-                cell_value = self.board[i][j]
-                if cell_value >= 8000:
-                    cell_color = '#00FFFF'
-                else:
-                    cell_color = '#%02x%02x%02x' % (255, 255 - 20*int(math.log2(cell_value+1)), 255 - 20*int(math.log2(cell_value+1)))
-                self.label[i][j].config(text=str(cell_value), bg=cell_color)
+        # 진행 중인 애니메이션이 이전 판의 칸으로 새 판을 그리지 않도록 먼저 끝냄
+        self.view.finish()
+        self.view.draw(self.game.board)
+        self.score_label['text'] = 'Score: ' + str(self.game.score)
 
-        self.score_label['text'] = 'Score: ' + str(self.score)
+    def play(self, direction):
+        # 진행 중인 애니메이션은 끝 상태로 바로 넘기고 입력을 즉시 처리
+        self.view.finish()
+
+        before = [row[:] for row in self.game.board]
+        slides, merged = self.game.slides(direction)
+        if self.game.step(direction):
+            self.view.animate(before, slides, merged, self.game.board)
+            self.score_label['text'] = 'Score: ' + str(self.game.score)
 
     def key_pressed(self, event):
         key = event.keysym
-        if key in ['Up', 'Down', 'Left', 'Right']:
-            before = self.board
-            self.move(key)
-            if before != self.board:
-                self.add_random_tile()
-                self.update_ui()
-
-    def move(self, direction):
-        if direction == 'Up':
-            self.board = [list(row) for row in zip(*self.board)]
-            self.board = [self.move_left(row) for row in self.board]
-            self.board = [list(row) for row in zip(*self.board)]
-        elif direction == 'Down':
-            self.board = [list(row[::-1]) for row in zip(*self.board)]
-            self.board = [self.move_left(row) for row in self.board]
-            self.board = [list(row) for row in zip(*self.board)][::-1]
-        elif direction == 'Left':
-            self.board = [self.move_left(row) for row in self.board]
-        elif direction == 'Right':
-            self.board = [row[::-1] for row in self.board]
-            self.board = [self.move_left(row) for row in self.board]
-            self.board = [row[::-1] for row in self.board]
-
-    def move_left(self, row):
-        row = [val for val in row if val != 0]
-        i = 0
-        while i < len(row) - 1:
-            if row[i] == row[i + 1]:
-                row[i] *= 2
-                self.score += row[i]
-                del row[i + 1]
-            i += 1
-        row += [0] * (4 - len(row))
-        return row
+        if key in DIRECTIONS:
+            self.play(key)
+        elif key == 'p':
+            self.toggle_auto()
+
+    def toggle_auto(self):
+        if self.auto:
+            self.window.after_cancel(self.auto)
+            self.auto = None
+            return
+
+        if not self.model:
+            if not Path(MODEL).exists():
+                return
+            from lib.ntuple import NTuple
+            self.model = NTuple.load(MODEL)
+
+        self.auto_move()
+
+    def auto_move(self):
+        from lib.ntuple import exponents
+
+        best = self.model.best_move(exponents(self.game.board))
+        if not best:
+            self.auto = None
+            return
+
+        self.play(best[0])
+        self.auto = self.window.after(AUTO_MS, self.auto_move)
 
     def run(self):
         self.window.mainloop()
 
     def size_change(self, size):
-        font = FONT, round(size / (11 * 14))
-        for row in self.label:
-            for l in row:
-                l['font'] = font
-
         font = FONT, round(size / (11 * 20))
         self.reset_btn['font'] = font
         self.score_label['font'] = font
 
     def close_game(self, _=None):
+        if self.auto:
+            self.window.after_cancel(self.auto)
+
         s = self.window.geometry()
         self.width, s = s.split('x')
         self.width = int(self.width)
@@ -145,10 +135,10 @@ class Game2048:
         db[2:4] = int_to_db(self.height)
         db[4:6] = int_to_db(self.geo_x)
         db[6:8] = int_to_db(self.geo_y)
-        db[8:10] = int_to_db(self.score // 4)
+        db[8:10] = int_to_db(self.game.score // 4)
 
         i = IDX
-        for row in self.board:
+        for row in self.game.board:
             for n in row:
                 db[i] = n.bit_length() - 1 if n else 0
                 i += 1
@@ -156,12 +146,7 @@ class Game2048:
         return db
 
     def reset(self):
-        self.board = [[0]*4 for _ in range(4)]
-        self.score = 0
-
-        self.add_random_tile()
-        self.add_random_tile()
-
+        self.game.reset()
         self.update_ui()
 
 
@@ -0,0 +1,162 @@
+import argparse
+import operator
+import random
+import re
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from lib.board import DIRECTIONS
+from lib.ntuple import NTuple, move, play_episode
+from lib.store import COLUMNS, GameStore, pack, unpack
+
+BATCH = 1000
+SCORE_BIN = 64
+
+
+class RandomPlayer:
+    def __init__(self, seed):
+        # 판의 타일 난수(Random(seed))와 겹치지 않는 별도의 수열
+        self.rng = random.Random(f'moves-{seed}')
+
+    def best_move(self, board):
+        moves = []
+        for d in DIRECTIONS:
+            after, reward = move(board, d)
+            if after != board:
+                moves.append((d, after, reward))
+        return self.rng.choice(moves) if moves else None
+
+
+def init_worker(path):
+    global model
+    model = NTuple.load(path) if path else None
+
+def simulate(seeds):
+    res = {name: [] for name in COLUMNS}
+    for seed in seeds:
+        score, max_tile, moves, board = play_episode(model or RandomPlayer(seed), seed)
+        res['seed'].append(seed)
+        res['score'].append(score)
+        res['max_tile'].append(max_tile)
+        res['moves'].append(moves)
+        res['board'].append(pack(board))
+    return res
+
+def cmd_simulate(args):
+    store = GameStore(args.store)
+    batches = [range(s, min(s + BATCH, args.seed + args.n))
+               for s in range(args.seed, args.seed + args.n, BATCH)]
+
+    t = time.perf_counter()
+    n = 0
+    with Pool(args.workers, init_worker, (args.model,)) as pool:
+        # 결과가 오는 순서대로 배치 단위로 이어씀
+        for res in pool.imap_unordered(simulate, batches):
+            store.append(**res)
+            n += len(res['seed'])
+            print(f'\r{n} games, {n / (time.perf_counter() - t):.0f} games/s', end='')
+    print(f'\n{len(store)} rows in {args.store}')
+
+
+OPS = {'>=': operator.ge, '<=': operator.le, '==': operator.eq,
+       '!=': operator.ne, '>': operator.gt, '<': operator.lt}
+
+def parse_where(where):
+    res = []
+    for cond in where:
+        m = re.fullmatch(r'\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(\d+)\s*', cond)
+        if not m or m[1] not in COLUMNS or m[1] == 'board':
+            raise SystemExit(f'bad condition: {cond}')
+        res.append((m[1], OPS[m[2]], int(m[3])))
+    return res
+
+def summarize(store, where, head):
+    names = {'score', 'max_tile', 'moves'} | {name for name, _, _ in where}
+    if head:
+        names |= set(COLUMNS)
+
+    n = 0
+    score_sum = 0.0
+    score_sq = 0.0
+    moves_sum = 0
+    score_max = 0
+    score_hist = np.zeros(1, np.int64)
+    tile_hist = np.zeros(17, np.int64)
+    rows = []
+
+    # 청크마다 히스토그램과 합계만 누적하므로 메모리는 청크 크기에만 비례
+    for chunk in store.chunks(names):
+        mask = np.ones(len(chunk['score']), bool)
+        for name, op, value in where:
+            mask &= op(chunk[name], value)
+
+        score = chunk['score'][mask].astype(np.int64)
+        if not len(score):
+            continue
+
+        n += len(score)
+        score_sum += score.sum()
+        score_sq += (score.astype(np.float64) ** 2).sum()
+        score_max = max(score_max, int(score.max()))
+        moves_sum += int(chunk['moves'][mask].sum())
+
+        hist = np.bincount(score // SCORE_BIN)
+        if len(hist) > len(score_hist):
+            score_hist = np.pad(score_hist, (0, len(hist) - len(score_hist)))
+        score_hist[:len(hist)] += hist
+
+        tile_hist += np.bincount(np.log2(chunk['max_tile'][mask]).astype(np.int64), minlength=17)[:17]
+
+        if len(rows) < head:
+            idx = np.flatnonzero(mask)[:head - len(rows)]
+            rows += [{name: int(chunk[name][k]) for name in COLUMNS} for k in idx]
+
+    print(f'rows: {n} / {len(store)}')
+    if not n:
+        return
+
+    mean = score_sum / n
+    std = max(score_sq / n - mean * mean, 0) ** 0.5
+    cum = np.cumsum(score_hist)
+    quantiles = [(q, int(np.searchsorted(cum, q / 100 * n)) * SCORE_BIN) for q in (1, 10, 50, 90, 99)]
+
+    print(f'score: mean {mean:.1f}, std {std:.1f}, max {score_max}')
+    print('       ' + ', '.join(f'p{q} ~{v}' for q, v in quantiles))
+    print(f'moves: mean {moves_sum / n:.1f}')
+    print('max tile:')
+    for e in np.flatnonzero(tile_hist):
+        print(f'{1 << int(e):8} {tile_hist[e]:12} {tile_hist[e] / n:8.3%}')
+
+    for row in rows:
+        print(f"\nseed {row['seed']}  score {row['score']}  moves {row['moves']}")
+        board = unpack(row['board'])
+        for i in range(4):
+            print(' '.join(f'{1 << e if e else 0:5}' for e in board[i*4:i*4+4]))
+
+def cmd_summary(args):
+    summarize(GameStore(args.store), parse_where(args.where), args.head)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='simulate 2048 games in bulk and query the results')
+    sub = parser.add_subparsers(required=True)
+
+    p = sub.add_parser('simulate', help='play games headlessly and append them to a store')
+    p.add_argument('store')
+    p.add_argument('-n', type=int, default=10000)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('-j', '--workers', type=int, default=None)
+    p.add_argument('--model', default=None, help='n-tuple model (random moves if omitted)')
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser('summary', help='score / max tile distributions over a store')
+    p.add_argument('store')
+    p.add_argument('-w', '--where', action='append', default=[], metavar='COND',
+                   help="filter such as 'max_tile>=2048' (repeatable)")
+    p.add_argument('--head', type=int, default=0, help='print the first N matching games')
+    p.set_defaults(func=cmd_summary)
+
+    args = parser.parse_args()
+    args.func(args)
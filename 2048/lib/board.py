@@ -0,0 +1,113 @@
+import random
+
+DIRECTIONS = ('Up', 'Down', 'Left', 'Right')
+
+# 각 방향으로 밀 때 타일이 모이는 순서대로 나열한 줄
+LINES = {'Up': [[(i, j) for i in range(4)] for j in range(4)],
+         'Down': [[(i, j) for i in range(3, -1, -1)] for j in range(4)],
+         'Left': [[(i, j) for j in range(4)] for i in range(4)],
+         'Right': [[(i, j) for j in range(3, -1, -1)] for i in range(4)]}
+
+
+class Board2048:
+    def __init__(self, board=None, score=0, seed=None):
+        self.rng = random.Random(seed)
+        self.score = score
+
+        if board:
+            self.board = [list(board[i*4:i*4+4]) for i in range(4)]
+        else:
+            self.board = [[0]*4 for _ in range(4)]
+
+        if not any(map(any, self.board)):
+            self.add_random_tile()
+            self.add_random_tile()
+
+    def add_random_tile(self):
+        empty_cells = [(i, j) for i in range(4) for j in range(4) if self.board[i][j] == 0]
+        if empty_cells:
+            i, j = self.rng.choice(empty_cells)
+            self.board[i][j] = 2 if self.rng.random() < 0.9 else 4
+
+    def move(self, direction):
+        before = self.board
+
+        if direction == 'Up':
+            self.board = [list(row) for row in zip(*self.board)]
+            self.board = [self.move_left(row) for row in self.board]
+            self.board = [list(row) for row in zip(*self.board)]
+        elif direction == 'Down':
+            self.board = [list(row[::-1]) for row in zip(*self.board)]
+            self.board = [self.move_left(row) for row in self.board]
+            self.board = [list(row) for row in zip(*self.board)][::-1]
+        elif direction == 'Left':
+            self.board = [self.move_left(row) for row in self.board]
+        elif direction == 'Right':
+            self.board = [row[::-1] for row in self.board]
+            self.board = [self.move_left(row) for row in self.board]
+            self.board = [row[::-1] for row in self.board]
+
+        return before != self.board
+
+    def move_left(self, row):
+        row = [val for val in row if val != 0]
+        i = 0
+        while i < len(row) - 1:
+            if row[i] == row[i + 1]:
+                row[i] *= 2
+                self.score += row[i]
+                del row[i + 1]
+            i += 1
+        row += [0] * (4 - len(row))
+        return row
+
+    def slides(self, direction):
+        # move 전에 호출: [(출발 칸, 도착 칸)], [합쳐지는 칸]
+        res = []
+        merged = []
+        for line in LINES[direction]:
+            cells = [(i, j) for i, j in line if self.board[i][j]]
+            k = 0
+            for to in line:
+                if k >= len(cells):
+                    break
+                i, j = cells[k]
+                res.append((cells[k], to))
+                if k + 1 < len(cells) and self.board[i][j] == self.board[cells[k+1][0]][cells[k+1][1]]:
+                    res.append((cells[k+1], to))
+                    merged.append(to)
+                    k += 2
+                else:
+                    k += 1
+        return res, merged
+
+    def step(self, direction):
+        moved = self.move(direction)
+        if moved:
+            self.add_random_tile()
+        return moved
+
+    def can_move(self):
+        for i in range(4):
+            for j in range(4):
+                n = self.board[i][j]
+                if n == 0:
+                    return True
+                if j < 3 and n == self.board[i][j + 1]:
+                    return True
+                if i < 3 and n == self.board[i + 1][j]:
+                    return True
+        return False
+
+    def max_tile(self):
+        return max(map(max, self.board))
+
+    def flat(self):
+        return [n for row in self.board for n in row]
+
+    def reset(self):
+        self.board = [[0]*4 for _ in range(4)]
+        self.score = 0
+
+        self.add_random_tile()
+        self.add_random_tile()
@@ -0,0 +1,204 @@
+import random
+from pathlib import Path
+
+import numpy as np
+
+from lib.board import Board2048, DIRECTIONS
+
+"""
+n-tuple network
+
+board: 타일의 지수 16개 (row-major, 0 = 빈칸, 최대 15)
+weights: 튜플마다 16^6 크기의 float32 테이블을 이어붙인 1차원 배열 (.npy)
+         로드할 때 mmap으로 열기 때문에 수백 MB 모델도 바로 시작됨
+"""
+
+TUPLES = [(0, 1, 2, 3, 4, 5),
+          (4, 5, 6, 7, 8, 9),
+          (0, 1, 2, 4, 5, 6),
+          (4, 5, 6, 8, 9, 10)]
+
+TUPLE_LEN = 6
+TABLE_SIZE = 16 ** TUPLE_LEN
+MAX_EXP = 15
+
+ALPHA = 0.1
+
+
+def _symmetries():
+    cells = [(i, j) for i in range(4) for j in range(4)]
+    transforms = [lambda i, j: (i, j),
+                  lambda i, j: (j, 3 - i),
+                  lambda i, j: (3 - i, 3 - j),
+                  lambda i, j: (3 - j, i),
+                  lambda i, j: (i, 3 - j),
+                  lambda i, j: (3 - j, 3 - i),
+                  lambda i, j: (3 - i, j),
+                  lambda i, j: (j, i)]
+
+    res = []
+    for f in transforms:
+        k = [i*4 + j for i, j in (f(i, j) for i, j in cells)]
+        res.append(k)
+    return res
+
+SYMMETRIES = _symmetries()
+
+# (len(TUPLES) * 8, TUPLE_LEN) 칸 번호와 각 행의 테이블 오프셋
+CELLS = np.array([[sym[k] for k in t] for t in TUPLES for sym in SYMMETRIES], dtype=np.intp)
+OFFSET = np.repeat(np.arange(len(TUPLES), dtype=np.intp) * TABLE_SIZE, len(SYMMETRIES))
+POW = 16 ** np.arange(TUPLE_LEN, dtype=np.intp)
+
+FEATURES = len(CELLS)
+
+
+def _row_tables():
+    # Board2048.move_left 규칙을 그대로 사용해 4칸 한 줄의 결과를 미리 계산
+    rule = Board2048([1] * 16)
+    rows = [None] * (1 << 16)
+    rewards = [0] * (1 << 16)
+
+    for code in range(1 << 16):
+        exps = [(code >> (4 * k)) & 15 for k in range(4)]
+        rule.score = 0
+        row = rule.move_left([1 << e if e else 0 for e in exps])
+        rows[code] = tuple(min(n.bit_length() - 1, MAX_EXP) if n else 0 for n in row)
+        rewards[code] = rule.score
+
+    return rows, rewards
+
+ROWS, REWARDS = _row_tables()
+
+LINES = {'Left': [[i*4 + j for j in range(4)] for i in range(4)],
+         'Right': [[i*4 + j for j in range(3, -1, -1)] for i in range(4)],
+         'Up': [[i*4 + j for i in range(4)] for j in range(4)],
+         'Down': [[i*4 + j for i in range(3, -1, -1)] for j in range(4)]}
+
+
+def exponents(board):
+    # 가중치 표와 행 코드(4비트)가 MAX_EXP까지이므로 더 큰 타일은 MAX_EXP로
+    return [min(n.bit_length() - 1, MAX_EXP) if n else 0 for row in board for n in row]
+
+def move(board, direction):
+    res = list(board)
+    reward = 0
+
+    for line in LINES[direction]:
+        code = board[line[0]] | board[line[1]] << 4 | board[line[2]] << 8 | board[line[3]] << 12
+        reward += REWARDS[code]
+        for k, e in zip(line, ROWS[code]):
+            res[k] = e
+
+    return res, reward
+
+def add_random_tile(board, rng):
+    empty = [k for k in range(16) if not board[k]]
+    if empty:
+        board[rng.choice(empty)] = 1 if rng.random() < 0.9 else 2
+
+def can_move(board):
+    return any(move(board, d)[0] != board for d in DIRECTIONS)
+
+
+class NTuple:
+    def __init__(self, weights):
+        self.weights = weights
+
+    @classmethod
+    def create(cls, path):
+        weights = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32,
+                                            shape=(len(TUPLES) * TABLE_SIZE,))
+        weights.flush()
+        return cls(weights)
+
+    @classmethod
+    def load(cls, path, writable=False):
+        weights = np.load(path, mmap_mode='r+' if writable else 'r')
+        if weights.shape != (len(TUPLES) * TABLE_SIZE,):
+            raise ValueError(f'{path}: model shape {weights.shape} does not match TUPLES')
+        return cls(weights)
+
+    @classmethod
+    def open(cls, path):
+        if Path(path).exists():
+            return cls.load(path, True)
+        return cls.create(path)
+
+    def index(self, boards):
+        return np.asarray(boards, dtype=np.intp)[:, CELLS] @ POW + OFFSET
+
+    def evaluate(self, boards):
+        return self.weights[self.index(boards)].sum(axis=1)
+
+    def best_move(self, board):
+        moves = []
+        for d in DIRECTIONS:
+            after, reward = move(board, d)
+            if after != board:
+                moves.append((d, after, reward))
+
+        if not moves:
+            return None
+
+        values = self.evaluate([after for _, after, _ in moves])
+        k = max(range(len(moves)), key=lambda k: moves[k][2] + values[k])
+        return moves[k]
+
+    def update(self, board, target):
+        idx = self.index([board])[0]
+        err = target - self.weights[idx].sum()
+        np.add.at(self.weights, idx, ALPHA / FEATURES * err)
+
+    def learn_episode(self, rng):
+        # afterstate TD(0)
+        board = [0] * 16
+        add_random_tile(board, rng)
+        add_random_tile(board, rng)
+
+        score = 0
+        moves = 0
+        after = None
+
+        while True:
+            best = self.best_move(board)
+
+            if after is not None:
+                if best:
+                    _, after_next, reward = best
+                    self.update(after, reward + self.evaluate([after_next])[0])
+                else:
+                    self.update(after, 0)
+
+            if not best:
+                break
+
+            _, after, reward = best
+            score += reward
+            moves += 1
+
+            board = list(after)
+            add_random_tile(board, rng)
+
+        return score, 1 << max(board), moves, board
+
+    def flush(self):
+        if isinstance(self.weights, np.memmap):
+            self.weights.flush()
+
+
+def play_episode(model, seed):
+    rng = random.Random(seed)
+    board = [0] * 16
+    add_random_tile(board, rng)
+    add_random_tile(board, rng)
+
+    score = 0
+    moves = 0
+    while best := model.best_move(board):
+        _, board, reward = best
+        board = list(board)
+        add_random_tile(board, rng)
+        score += reward
+        moves += 1
+
+    return score, 1 << max(board), moves, board
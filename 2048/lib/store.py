@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import numpy as np
+
+"""
+Game store structure
+
+디렉터리 하나에 열(column)마다 파일 하나 (<name>.col, little-endian raw)
+행 수 = 파일 크기 // itemsize, 모든 열의 행 수가 같아야 함
+추가는 각 파일 끝에 이어쓰기, 읽기는 np.memmap
+
+board: 칸마다 지수 4비트, [0]칸이 최하위 비트
+"""
+
+COLUMNS = {'seed': np.dtype('<u8'),
+           'score': np.dtype('<u4'),
+           'max_tile': np.dtype('<u4'),
+           'moves': np.dtype('<u4'),
+           'board': np.dtype('<u8')}
+
+CHUNK = 1 << 22
+
+
+def pack(board):
+    res = 0
+    for k, e in enumerate(board):
+        res |= e << (4 * k)
+    return res
+
+def unpack(packed):
+    return [(packed >> (4 * k)) & 15 for k in range(16)]
+
+
+class GameStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # 일부 열 파일만 없으면 다른 열을 0행으로 자르지 않고 멈춤 (빈 디렉터리는 새 저장소)
+        missing = [name for name in COLUMNS if not self.file(name).exists()]
+        if missing and len(missing) < len(COLUMNS):
+            raise FileNotFoundError(f'{self.path}: missing column files {missing}')
+
+        # 추가 도중 중단되어 열 길이가 어긋났으면 가장 짧은 열에 맞춤
+        n = len(self)
+        for name, dtype in COLUMNS.items():
+            file = self.file(name)
+            if file.exists() and file.stat().st_size != n * dtype.itemsize:
+                with open(file, 'r+b') as f:
+                    f.truncate(n * dtype.itemsize)
+
+    def file(self, name):
+        return self.path / f'{name}.col'
+
+    def __len__(self):
+        sizes = [self.file(name).stat().st_size // dtype.itemsize if self.file(name).exists() else 0
+                 for name, dtype in COLUMNS.items()]
+        return min(sizes)
+
+    def append(self, **columns):
+        if set(columns) != set(COLUMNS):
+            raise ValueError(f'columns must be {list(COLUMNS)}')
+
+        arrays = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        if len({len(a) for a in arrays.values()}) != 1:
+            raise ValueError('columns must have the same length')
+
+        for name, a in arrays.items():
+            with open(self.file(name), 'ab') as f:
+                a.tofile(f)
+
+    def column(self, name):
+        n = len(self)
+        if not n:
+            return np.empty(0, COLUMNS[name])
+        return np.memmap(self.file(name), dtype=COLUMNS[name], mode='r', shape=(n,))
+
+    def chunks(self, names, size=CHUNK):
+        # 한 번에 size 행씩만 메모리에 올림
+        columns = {name: self.column(name) for name in names}
+        for start in range(0, len(self), size):
+            yield {name: np.array(c[start:start + size]) for name, c in columns.items()}
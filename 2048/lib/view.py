@@ -0,0 +1,154 @@
+import tkinter as tk
+import tkinter.font as tkfont
+import math
+from time import perf_counter
+
+FPS = 60
+MSPF = 1000 // FPS
+
+SLIDE_TIME = 0.1
+POP_TIME = 0.08
+POP_SCALE = 0.15
+
+GAP = 0.05  # 칸 크기 대비 여백
+BG = '#bbada0'
+EMPTY = '#cdc1b4'
+
+
+def tile_color(n):
+    if n >= 8000:
+        return '#00FFFF'
+    c = 255 - 20*int(math.log2(n+1))
+    return '#%02x%02x%02x' % (255, c, c)
+
+
+class Tile:
+    __slots__ = ('rect', 'text')
+
+    def __init__(self, canvas, font):
+        self.rect = canvas.create_rectangle(0, 0, 0, 0, width=0, state='hidden')
+        self.text = canvas.create_text(0, 0, font=font, state='hidden')
+
+
+class CanvasBoard(tk.Canvas):
+    def __init__(self, master, family):
+        super().__init__(master, bg=BG, highlightthickness=0)
+
+        # 모든 타일이 같은 Font 객체를 쓰므로 크기 변경은 configure 한 번
+        self.font = tkfont.Font(family=family, size=20)
+
+        self.cell = 0
+        self.cells = [[self.create_rectangle(0, 0, 0, 0, fill=EMPTY, width=0) for _ in range(4)]
+                      for _ in range(4)]
+        # 한 번 밀 때 움직이는 타일은 최대 16개이므로 16개를 재사용
+        self.tiles = [Tile(self, self.font) for _ in range(16)]
+
+        self.board = [[0]*4 for _ in range(4)]
+        self.anim = None
+        self.after_id = None
+
+        self.bind('<Configure>', self.resize)
+
+    def resize(self, e):
+        self.cell = min(e.width, e.height) / 4
+        self.font.configure(size=-round(self.cell * 0.3))
+
+        for i in range(4):
+            for j in range(4):
+                self.coords(self.cells[i][j], *self.bbox_at(i, j))
+
+        self.finish()
+        self.draw(self.board)
+
+    def bbox_at(self, i, j, scale=1):
+        g = self.cell * (GAP + (1 - 2*GAP) * (1 - scale) / 2)
+        x, y = j * self.cell, i * self.cell
+        return x + g, y + g, x + self.cell - g, y + self.cell - g
+
+    def move_tile(self, tile, i, j, scale=1):
+        x0, y0, x1, y1 = self.bbox_at(i, j, scale)
+        self.coords(tile.rect, x0, y0, x1, y1)
+        self.coords(tile.text, (x0 + x1) / 2, (y0 + y1) / 2)
+
+    def show_tile(self, tile, n):
+        self.itemconfig(tile.rect, fill=tile_color(n), state='normal')
+        self.itemconfig(tile.text, text=str(n), state='normal')
+
+    def hide_from(self, k):
+        for tile in self.tiles[k:]:
+            self.itemconfig(tile.rect, state='hidden')
+            self.itemconfig(tile.text, state='hidden')
+
+    def draw(self, board):
+        self.board = [row[:] for row in board]
+
+        k = 0
+        for i in range(4):
+            for j in range(4):
+                if board[i][j]:
+                    self.move_tile(self.tiles[k], i, j)
+                    self.show_tile(self.tiles[k], board[i][j])
+                    k += 1
+        self.hide_from(k)
+
+    def animate(self, before, slides, merged, board):
+        self.finish()
+
+        self.board = [row[:] for row in board]
+
+        dests = {to for _, to in slides}
+        pops = [(i, j, 1) for i, j in merged]
+        pops += [(i, j, 0) for i in range(4) for j in range(4)
+                 if board[i][j] and (i, j) not in dests]
+
+        self.anim = [perf_counter(), slides, pops, False]
+
+        # 색과 글자는 시작할 때 한 번만 설정하고 프레임마다 coords만 바꿈
+        for tile, ((i, j), _) in zip(self.tiles, slides):
+            self.show_tile(tile, before[i][j])
+        self.hide_from(len(slides))
+
+        self.frame()
+
+    def frame(self):
+        self.after_id = None
+        start, slides, pops, popping = self.anim
+
+        elapsed = perf_counter() - start
+        if elapsed >= SLIDE_TIME + POP_TIME:
+            self.finish()
+            return
+
+        if elapsed < SLIDE_TIME:
+            # 위치를 경과 시간으로 정하므로 밀린 프레임은 건너뛰게 됨
+            t = elapsed / SLIDE_TIME
+            t = 1 - (1 - t) * (1 - t)
+            for tile, ((i0, j0), (i1, j1)) in zip(self.tiles, slides):
+                self.move_tile(tile, i0 + (i1 - i0) * t, j0 + (j1 - j0) * t)
+        else:
+            if not popping:
+                self.draw(self.board)
+                tile_at = {}
+                k = 0
+                for i in range(4):
+                    for j in range(4):
+                        if self.board[i][j]:
+                            tile_at[i, j] = self.tiles[k]
+                            k += 1
+                self.anim[2] = pops = [(tile_at[i, j], i, j, merge) for i, j, merge in pops]
+                self.anim[3] = True
+
+            t = (elapsed - SLIDE_TIME) / POP_TIME
+            for tile, i, j, merge in pops:
+                self.move_tile(tile, i, j, 1 + POP_SCALE * math.sin(math.pi * t) if merge else t)
+
+        next_ms = MSPF - int(elapsed * 1000) % MSPF
+        self.after_id = self.after(next_ms, self.frame)
+
+    def finish(self):
+        if self.after_id:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+        if self.anim:
+            self.anim = None
+            self.draw(self.board)
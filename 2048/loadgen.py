@@ -0,0 +1,68 @@
+import asyncio
+import argparse
+import random
+import time
+
+from server import HOST, PORT
+
+
+async def bot(host, port, seed, moves, latency):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random(seed)
+
+    async def request(line):
+        t = time.perf_counter()
+        writer.write(line.encode() + b'\n')
+        res = (await reader.readline()).decode().split()
+        latency.append(time.perf_counter() - t)
+        if res[0] != 'OK':
+            raise RuntimeError(' '.join(res))
+        return res
+
+    sid = (await request(f'NEW {seed}'))[1]
+
+    played = 0
+    while played < moves:
+        res = await request(f'MOVE {sid} {rng.choice("UDLR")}')
+        played += 1
+        if res[-1] == '1':
+            sid = (await request(f'NEW {rng.getrandbits(32)}'))[1]
+
+    await request(f'DEL {sid}')
+    writer.write(b'QUIT\n')
+    writer.close()
+
+    return played
+
+
+async def main(host, port, clients, moves, seed):
+    latency = []
+
+    t = time.perf_counter()
+    played = await asyncio.gather(*(bot(host, port, seed + i, moves, latency)
+                                    for i in range(clients)))
+    t = time.perf_counter() - t
+
+    latency.sort()
+    p50 = latency[len(latency) // 2] * 1000
+    p99 = latency[min(len(latency) - 1, len(latency) * 99 // 100)] * 1000
+
+    print(f'clients: {clients}',
+          f'moves: {sum(played)}',
+          f'time: {t:.2f}s',
+          f'moves/s: {sum(played) / t:.0f}',
+          f'p50: {p50:.2f}ms',
+          f'p99: {p99:.2f}ms',
+          sep='\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='load generator for the 2048 server')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('-c', '--clients', type=int, default=100)
+    parser.add_argument('-n', '--moves', type=int, default=1000, help='moves per client')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.host, args.port, args.clients, args.moves, args.seed))
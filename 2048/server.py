@@ -0,0 +1,156 @@
+import asyncio
+import argparse
+import time
+from collections import OrderedDict
+from itertools import count
+
+from lib.board import Board2048, DIRECTIONS
+
+
+HOST = '127.0.0.1'
+PORT = 2048
+
+IDLE_TIMEOUT = 300  # 초
+EVICT_INTERVAL = 5
+MAX_SESSIONS = 100000
+
+"""
+Protocol (한 줄에 명령 하나, 응답 하나)
+
+NEW [seed]         -> OK <sid> <board> <score>
+MOVE <sid> <dir>   -> OK <board> <score> <moved> <over>
+GET <sid>          -> OK <board> <score> <over>
+DEL <sid>          -> OK
+QUIT               -> 연결 종료
+
+dir: Up / Down / Left / Right (U / D / L / R)
+board: 16칸의 값을 ','로 연결 (0 = 빈칸)
+moved, over: 0 / 1
+실패 시: ERR <message>
+"""
+
+SHORT_DIRECTION = {d[0]: d for d in DIRECTIONS}
+
+
+class Session:
+    __slots__ = ('game', 'last')
+
+    def __init__(self, seed):
+        self.game = Board2048(seed=seed)
+        self.last = time.monotonic()
+
+    def state(self):
+        return ','.join(map(str, self.game.flat())) + f' {self.game.score}'
+
+
+class Server:
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+
+        # 마지막 사용 순서로 정렬 (앞쪽이 가장 오래된 세션)
+        self.sessions = OrderedDict()
+        self.sid = count(1)
+
+        self.evicted = 0
+
+    def touch(self, sid):
+        session = self.sessions[sid]
+        session.last = time.monotonic()
+        self.sessions.move_to_end(sid)
+        return session
+
+    def evict(self):
+        deadline = time.monotonic() - self.idle_timeout
+        while self.sessions:
+            sid, session = next(iter(self.sessions.items()))
+            if session.last > deadline and len(self.sessions) <= self.max_sessions:
+                break
+            del self.sessions[sid]
+            self.evicted += 1
+
+    async def evict_loop(self):
+        while True:
+            await asyncio.sleep(EVICT_INTERVAL)
+            self.evict()
+
+    def command(self, line):
+        cmd, *args = line.split()
+        cmd = cmd.upper()
+
+        if cmd == 'NEW':
+            seed = int(args[0]) if args else None
+            sid = next(self.sid)
+            session = self.sessions[sid] = Session(seed)
+            if len(self.sessions) > self.max_sessions:
+                self.evict()
+            return f'OK {sid} {session.state()}'
+
+        if cmd == 'MOVE':
+            sid, direction = int(args[0]), args[1]
+            direction = SHORT_DIRECTION.get(direction, direction)
+            if direction not in DIRECTIONS:
+                return f'ERR bad direction {direction}'
+            session = self.touch(sid)
+            moved = session.game.step(direction)
+            return f'OK {session.state()} {int(moved)} {int(not session.game.can_move())}'
+
+        if cmd == 'GET':
+            session = self.touch(int(args[0]))
+            return f'OK {session.state()} {int(not session.game.can_move())}'
+
+        if cmd == 'DEL':
+            del self.sessions[int(args[0])]
+            return 'OK'
+
+        return f'ERR unknown command {cmd}'
+
+    async def handle(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                line = line.decode().strip()
+                if not line:
+                    continue
+                if line.upper() == 'QUIT':
+                    break
+
+                try:
+                    res = self.command(line)
+                except KeyError:
+                    res = 'ERR no such session'
+                except (IndexError, ValueError):
+                    res = 'ERR bad arguments'
+
+                writer.write(res.encode() + b'\n')
+                # 버퍼가 찰 때만 대기
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        evictor = asyncio.create_task(self.evict_loop())
+
+        print(f'2048 server on {host}:{port}')
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='2048 multi-session server')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--idle', type=float, default=IDLE_TIMEOUT, help='idle session timeout (s)')
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(Server(args.idle, args.max_sessions).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from lib.ntuple import NTuple, TUPLES, TABLE_SIZE, MAX_EXP, exponents
+from lib.store import COLUMNS, GameStore
+
+
+def test_exponents_clamp_large_tiles():
+    board = [[65536, 2, 0, 0], [4, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 2]]
+    exps = exponents(board)
+    assert exps[0] == MAX_EXP
+
+    model = NTuple(np.zeros(len(TUPLES) * TABLE_SIZE, np.float32))
+    assert model.best_move(exps) is not None
+
+
+def test_store_refuses_missing_column(tmp_path):
+    store = GameStore(tmp_path)
+    store.append(seed=[1, 2], score=[10, 20], max_tile=[4, 8], moves=[3, 5], board=[0, 0])
+    store.file('moves').unlink()
+
+    with pytest.raises(FileNotFoundError):
+        GameStore(tmp_path)
+    assert store.file('score').stat().st_size == 2 * COLUMNS['score'].itemsize
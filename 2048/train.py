@@ -0,0 +1,65 @@
+import argparse
+import random
+import time
+from multiprocessing import Pool
+
+from lib.ntuple import NTuple, play_episode
+
+MODEL = 'ntuple.npy'
+
+REPORT = 1000
+
+
+def init_worker(path):
+    global model
+    # 모든 워커가 같은 파일을 mmap으로 열어 가중치를 공유 (lock-free 갱신)
+    model = NTuple.load(path, True)
+
+def learn(seed):
+    return model.learn_episode(random.Random(seed))
+
+def evaluate(seed):
+    return play_episode(model, seed)
+
+
+def report(n, results, t):
+    scores = [r[0] for r in results]
+    tiles = [r[1] for r in results]
+    moves = sum(r[2] for r in results)
+
+    print(f'episodes: {n:8}  '
+          f'mean: {sum(scores) / len(scores):9.1f}  '
+          f'max: {max(scores):7}  '
+          f'2048+: {sum(t >= 2048 for t in tiles) / len(tiles):6.1%}  '
+          f'moves/s: {moves / t:8.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='train the 2048 n-tuple network by TD learning')
+    parser.add_argument('--model', default=MODEL)
+    parser.add_argument('-n', '--episodes', type=int, default=100000)
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--eval', action='store_true', help='play without learning')
+    args = parser.parse_args()
+
+    NTuple.open(args.model).flush()
+
+    job = evaluate if args.eval else learn
+    seeds = range(args.seed, args.seed + args.episodes)
+
+    with Pool(args.workers, init_worker, (args.model,)) as pool:
+        results = []
+        n = 0
+        t = time.perf_counter()
+        for result in pool.imap_unordered(job, seeds, chunksize=16):
+            results.append(result)
+            n += 1
+            if len(results) == REPORT or n == args.episodes:
+                report(n, results, time.perf_counter() - t)
+                results = []
+                t = time.perf_counter()
+
+    if not args.eval:
+        # 워커들이 갱신한 페이지를 디스크에 기록
+        NTuple.load(args.model, True).flush()
@@ -0,0 +1,99 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from lib.sim import (FPS, WIDTH, HEIGHT, PLAYER_SIZE, PLAYER_SPEED, MOB_SIZE,
+                     MOB_LINEAR_SPEED_MIN, MOB_LINEAR_SPEED_MAX, MOB_LINEAR_N, DIRECTIONS, swept_hit)
+
+"""
+고정된 궤적 하나를 여러 틱 속도로 다시 재생해서 충돌 판정만 비교
+
+궤적은 연속 시간으로 정함: 직선 몹은 등속 직선, 플레이어는 TURN초마다 방향을 바꾸는 꺾은선
+TURN이 모든 틱 간격의 배수이므로 어느 틱 속도로 샘플링해도 틱 사이의 이동은 같은 선분
+(Sim을 돌리면 추적 몹의 조향이 틱 속도에 따라 달라지므로 판정이 아닌 궤적 차이까지 섞임)
+
+기준: FPS에서 swept. 몹마다 처음 겹친 시각을 구해서, 다른 틱 속도의 swept 판정이
+기준의 모든 충돌을 (그 시각을 포함하는 틱에서) 찾는지 확인
+"""
+
+TURN = 0.1  # 플레이어가 방향을 바꾸는 간격 (초)
+
+
+def trajectory(seed, duration):
+    # 시각 t (배열)에서의 플레이어 위치 (T, 2)와 몹 위치 (T, 몹, 2)를 주는 함수
+    rng = random.Random(seed)
+    speed = PLAYER_SPEED * FPS  # px/s
+    turns = [DIRECTIONS[rng.randrange(len(DIRECTIONS))] for _ in range(int(duration / TURN) + 1)]
+    v = np.array([(d.x, d.y) for d in turns]) * speed
+    corners = np.concatenate(([(WIDTH / 2, HEIGHT / 2)], (WIDTH / 2, HEIGHT / 2) + np.cumsum(v * TURN, axis=0)))
+
+    m0 = np.array([(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(MOB_LINEAR_N)])
+    angle = np.array([rng.uniform(0, 2 * np.pi) for _ in range(MOB_LINEAR_N)])
+    mv = (np.stack((np.cos(angle), np.sin(angle)), axis=1)
+          * np.array([rng.uniform(MOB_LINEAR_SPEED_MIN, MOB_LINEAR_SPEED_MAX) for _ in range(MOB_LINEAR_N)])[:, None]
+          * FPS)
+
+    def at(t):
+        k = np.minimum((t / TURN + 1e-9).astype(int), len(v) - 1)
+        player = corners[k] + v[k] * (t - k * TURN)[:, None]
+        return player, m0 + mv * t[:, None, None]
+
+    return at
+
+def detect(at, tps, swept, duration):
+    # 몹마다 처음 겹친 틱 (없으면 -1)과 판정에 든 CPU 시간. 틱마다 한 번씩 판정 (게임에서처럼)
+    ticks = int(round(duration * tps))
+    player, mobs = at(np.arange(ticks + 1) / tps)
+    r = PLAYER_SIZE + MOB_SIZE
+    first = np.full(mobs.shape[1], -1)
+
+    t = time.process_time()
+    for i in range(1, ticks + 1):
+        if swept:
+            hit = swept_hit(player[i - 1], player[i], mobs[i - 1], mobs[i], r)
+        else:
+            d = mobs[i] - player[i]
+            hit = np.hypot(d[:, 0], d[:, 1]) <= r
+        first[hit & (first < 0)] = i
+    return first, time.process_time() - t
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='replay fixed trajectories at several tick rates and compare hit detection')
+    parser.add_argument('-n', '--games', type=int, default=500)
+    parser.add_argument('--tps', type=int, nargs='+', default=[60, 30, 20])
+    parser.add_argument('--time', type=float, default=5, help='seconds per trajectory')
+    args = parser.parse_args()
+
+    for tps in args.tps:
+        if round(TURN * tps, 9) % 1:
+            parser.error(f'--tps {tps}: {TURN}s turns must be a whole number of ticks')
+
+    trajectories = [trajectory(seed, args.time) for seed in range(args.games)]
+    ref = [detect(at, FPS, True, args.time) for at in trajectories]
+    ref_hits = sum(int((first >= 0).sum()) for first, _ in ref)
+    print(f'{"mode":>16} {"hits":>6} {"found":>7} {"missed":>7} {"ticks":>8} {"cpu":>8}')
+    print(f'{f"{FPS}Hz swept":>16} {ref_hits:6} {"ref":>7} {"":>7} '
+          f'{int(round(args.time * FPS)) * args.games:8} {sum(t for _, t in ref):7.2f}s')
+
+    for tps in args.tps:
+        for swept in (True, False):
+            found = hits = 0
+            cpu = 0.
+            for at, (ref_first, _) in zip(trajectories, ref):
+                first, t = detect(at, tps, swept, args.time)
+                cpu += t
+                hits += int((first >= 0).sum())
+                # 기준에서 겹친 시각 (ref_first - 1) / FPS ~ ref_first / FPS가 이 틱 안에 있어야 함
+                hit = ref_first >= 0
+                tick_end = first[hit] / tps
+                found += int(((first[hit] >= 0) & (tick_end >= (ref_first[hit] - 1) / FPS)
+                              & (tick_end - 1 / tps <= ref_first[hit] / FPS)).sum())
+            mode = f'{tps}Hz {"swept" if swept else "discrete"}'
+            rate = f'{found / ref_hits:7.1%}' if ref_hits else f'{"n/a":>7}'  # 기준에 충돌이 없으면
+            print(f'{mode:>16} {hits:6} {rate} {ref_hits - found:7} '
+                  f'{int(round(args.time * tps)) * args.games:8} {cpu:7.2f}s')
+            if swept:
+                assert found == ref_hits, f'{mode} missed {ref_hits - found} of {ref_hits} reference hits'
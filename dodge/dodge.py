@@ -1,194 +1,139 @@
+import sys
+import time
 import tkinter as tk
-from threading import Lock
-import random as rd
 from collections import namedtuple
+from pathlib import Path
 from types import SimpleNamespace
-from decimal import Decimal
 
-from lib.vector import Vector
+from lib.sim import (Sim, FPS, SPF, WIDTH, HEIGHT, PLAYER_SIZE, MOB_SIZE)
+from lib.render import Batch, Pool, Raster
+from lib.loop import Loop
+from lib.replay import InputLog, Replay
+from lib.bot import Autopilot
 
 
-FPS = 100
-MSPF = 1000 // FPS
-SPF = Decimal('0.01')  # 수동으로 변경해야 함
+TPS = FPS  # 시뮬레이션 틱 속도, 느린 컴퓨터에서는 30 정도로 낮춰도 충돌을 놓치지 않음
+MSPF = 1000 // FPS  # 렌더링 간격
+MAX_TICKS = 5  # 한 프레임에서 따라잡을 최대 틱 수
 
-WIDTH = 500
-HEIGHT = 500
+# 판마다 입력 기록을 저장 (python dodge.py <기록 파일> 로 재생)
+REPLAY_DIR = Path(__file__).parent / 'replays'  # 실행 위치와 상관없이 dodge/replays
+SEEK_TIME = 5  # 재생 중 ←/→ 로 건너뛰는 시간 (초)
 
 
 Shape = namedtuple('Shape', ['fill', 'outline', 'width'], defaults=('', 0))
 
-PLAYER_SIZE = 3
-PLAYER_SPEED = 1.5
 PLAYER_SHAPE = Shape('white')
-PLAYER_POS_INIT = Vector(WIDTH / 2, HEIGHT / 2)
-
-
-MOB_SIZE = 3
-
-MOB_LINEAR_SPEED_MIN = 0.5
-MOB_LINEAR_SPEED_MAX = 2
 MOB_LINEAR_SHAPE = Shape('yellow', 'red', 1.5)
-MOB_LINEAR_N = 50
-
-MOB_FOLLOWER_SPEED = 2
-MOB_FOLLOWER_ACC = 0.015
 MOB_FOLLOWER_SHAPE = Shape('light blue', 'blue', 1)
 
-
-class Player:
-    def __init__(self):
-        self.pos = PLAYER_POS_INIT
-        self.id = draw_circle(self.pos, PLAYER_SIZE, PLAYER_SHAPE)
-
-    def next_frame(self, d):
-        d *= PLAYER_SPEED
-
-        # tkinter canvas jot bug
-        lc = 2
-        hc = -1
-        pos = (self.pos + d).bound(PLAYER_SIZE + lc,
-                                   PLAYER_SIZE + lc,
-                                   WIDTH - PLAYER_SIZE - hc,
-                                   HEIGHT - PLAYER_SIZE - hc)
-        d = pos - self.pos
-        canvas.move(self.id, d.x, d.y)
-        self.pos = pos
-
-
-class Mob:
-    def __init__(self, shape, reset=False):
-        self.pos = Vector.rand_boundary(WIDTH, HEIGHT)
-        self.id = draw_circle(self.pos, MOB_SIZE, shape, 'mob')
-
-        if not reset:
-            mobs.append(self)
-
-    def next_frame(self):
-        raise NotImplementedError
-
-
-class MobLinear(Mob):
-    def __init__(self, *, reset=False):
-        super().__init__(MOB_LINEAR_SHAPE, reset)
-        self.d = Vector.rand() * rd.uniform(MOB_LINEAR_SPEED_MIN, MOB_LINEAR_SPEED_MAX)
-
-    def next_frame(self):
-        pos = (self.pos + self.d) % (WIDTH, HEIGHT, MOB_SIZE)
-        d = pos - self.pos
-        canvas.move(self.id, d.x, d.y)
-        self.pos = pos
-
-
-class MobFollower(Mob):
-    def __init__(self):
-        super().__init__(MOB_FOLLOWER_SHAPE)
-        self.heading = Vector.rand()
-
-    def next_frame(self):
-        self.heading += (player.pos - self.pos).norm() * MOB_FOLLOWER_ACC
-        self.heading = self.heading.norm()
-        d = self.heading * MOB_FOLLOWER_SPEED
-        self.pos += d
-        canvas.move(self.id, d.x, d.y)
-
-
-class Spawner:
-    def __init__(self, mob_class, cooltime, inittime):
-        self.mob_class = mob_class
-
-        self.cooltime = cooltime
-        self.next = inittime
-
-    def next_frame(self):
-        self.next -= 1
-        if self.next <= 0:
-            self.next = self.cooltime
-
-            self.mob_class()
+# 몹을 캔버스 항목 대신 이미지 하나에 그림 (몹이 아주 많을 때)
+RASTER = False
 
 
 def draw_circle(pos, size, shape, tag=None):
     return canvas.create_oval(*pos.bbox(size), **shape._asdict(), tag=tag)
 
+def mob_spawned(group, i):
+    if RASTER:
+        return
+    # 좌표는 다음 render에서 batch로 설정됨
+    group.ids[i] = pool.get(MOB_LINEAR_SHAPE if group is sim.linear else MOB_FOLLOWER_SHAPE)
+
+def mob_despawned(group, ids):
+    if not RASTER:
+        pool.release(ids)
+
+def draw_mobs(alpha):
+    linear, followers = sim.linear, sim.followers
+    if RASTER:
+        raster.clear()
+        raster.circles(linear.lerp(alpha), MOB_SIZE, MOB_LINEAR_SHAPE.fill)
+        raster.circles(followers.lerp(alpha), MOB_SIZE, MOB_FOLLOWER_SHAPE.fill)
+        raster.flush(batch)
+    else:
+        batch.circles(linear.ids[:linear.n], linear.lerp(alpha), MOB_SIZE)
+        batch.circles(followers.ids[:followers.n], followers.lerp(alpha), MOB_SIZE)
+
 def key_press(e):
-    if e.keysym == 'r' and gameover:
+    if e.keysym == 'F1':
+        overlay.shown = not overlay.shown
+        canvas.itemconfig(overlay.id, state='normal' if overlay.shown else 'hidden')
+    elif replay and e.keysym in ('Left', 'Right'):
+        seek = SEEK_TIME * sim.tps * (1 if e.keysym == 'Right' else -1)
+        replay.seek(sim.ticks + seek)
+        canvas.itemconfig('end', state='normal' if replay.done else 'hidden')
+        loop.start()
+    elif e.keysym == 'r' and (sim.over or replay):
         restart()
+    elif e.keysym == 'b' and not replay:
+        autopilot.on = not autopilot.on
 
     key_set.add(e.keysym)
 
 def key_release(e):
-    key_set.remove(e.keysym)
-
-key_direction = [(('w', 'Up'), (0, -1)),
-                 (('a', 'Left'), (-1, 0)),
-                 (('s', 'Down'), (0, 1)),
-                 (('d', 'Right'), (1, 0))]
-
-def next_frame():
-    global gameover
-
-    # 현재 프레임 연산이 끝나지 않았는데 다음 프레임 연산이 먼저 시작되는 것을 방지
-    with lock:
-        try:
-            if gameover:
-                return
-            id = root.after(MSPF, next_frame)
-
-            d = Vector(0, 0)
-            for keys, direction in key_direction:
-                if any(key in key_set for key in keys):
-                    d += Vector(*direction)
-            d = d.norm()
-
-            player.next_frame(d)
-            spawner.next_frame()
-            for mob in mobs:
-                mob.next_frame()
-
-            # 충돌 체크
-            pbbox = player.pos.bbox(PLAYER_SIZE + MOB_SIZE)
-            for mob in mobs:
-                if mob.pos.isin(*pbbox):
-                    if abs(player.pos - mob.pos) <= PLAYER_SIZE + MOB_SIZE:
-                        root.after_cancel(id)
-                        canvas.create_text(WIDTH / 2, HEIGHT / 2 - 20,
-                                           text='YOU DIED',
-                                           font=('맑은 고딕', 50), fill='red',
-                                           tags='end')
-                        canvas.create_text(WIDTH / 2, HEIGHT / 2 + 45,
-                                           text='PRESS R TO RESTART',
-                                           font=('맑은 고딕', 15), fill='yellow',
-                                           tags='end')
-                        gameover = True
-
-            timer.t += SPF
-            canvas.itemconfig(timer.id, text=f'{timer.t}s')
-
-            root.update_idletasks()
-        except Exception as e:
-            root.after_cancel(id)
-            raise e
-
-def mob_rand():
-    pos = Vector.rand_boundary(WIDTH, HEIGHT)
-    d = Vector.rand()
-    return pos, d
+    key_set.discard(e.keysym)
+
+key_direction = [('w', 'Up'),
+                 ('a', 'Left'),
+                 ('s', 'Down'),
+                 ('d', 'Right')]
+
+def read_direction():
+    mask = 0
+    for k, keys in enumerate(key_direction):
+        if any(key in key_set for key in keys):
+            mask |= 1 << k
+    return mask
+
+def save_log():
+    REPLAY_DIR.mkdir(exist_ok=True)
+    log.save(REPLAY_DIR / f'{time.strftime("%Y%m%d-%H%M%S")}-{log.seed}.dgr')
+
+def tick():
+    if replay:
+        if replay.step():
+            return True
+    else:
+        mask = autopilot.bot() if autopilot.on else read_direction()
+        log.append(mask)
+        if sim.tick(mask):
+            return True
+        save_log()
+
+    canvas.itemconfig('end', state='normal')
+    return False
+
+def render(alpha):
+    # 마지막 두 틱 사이를 alpha 비율로 보간해서 그림
+    if sim.over:
+        alpha = 1
+
+    batch.circle(player_id, sim.player.lerp(alpha), PLAYER_SIZE)
+    draw_mobs(alpha)
+
+    # 표시 시간은 실행된 틱 수로 계산 (밀린 틱은 Loop가 따라잡음)
+    batch.itemconfig(timer.id, text=f'{sim.time:.2f}s')
+    if overlay.shown:
+        batch.itemconfig(overlay.id, text=loop.stats.text(MSPF))
+
+    # 이번 프레임의 변경을 Tcl 호출 한 번으로 반영
+    batch.flush()
+    if sim.ticks // sim.tps != timer.title:
+        timer.title = sim.ticks // sim.tps
+        root.title(f'dodge{" replay" if replay else ""} - Tcl calls/frame: {batch.calls}, '
+                   f'items: {pool.created - len(pool.free)}/{pool.created}')
 
 def restart():
-    global gameover, mobs
-
-    canvas.delete(player.id, 'mob', 'end')
-
-    player.__init__()
-    mobs = mobs[:MOB_LINEAR_N]  # bad code
-    for mob in mobs:
-        mob.__init__(reset=True)
-
-    timer.t = 0
-
-    gameover = False
-    next_frame()
+    # 캔버스 항목은 지우지 않고 pool로 돌려보낸 뒤 다시 씀
+    global log
+    canvas.itemconfig('end', state='hidden')
+    if replay:
+        replay.seek(0)
+    else:
+        sim.reset()
+        log = InputLog.of(sim)
+    loop.start()
 
 
 root = tk.Tk()
@@ -198,24 +143,51 @@ root.resizable(False, False)
 canvas = tk.Canvas(bg='black', width=WIDTH, height=HEIGHT)
 canvas.pack()
 
-player = Player()
-mobs = []
+batch = Batch(canvas)
+pool = Pool(canvas, batch, 'mob')
+raster = Raster(canvas, WIDTH, HEIGHT) if RASTER else None
+
+replay = None
+if len(sys.argv) > 1:
+    log = InputLog.load(sys.argv[1])
+    sim = Sim(log.seed, log.tps, log.swept)
+else:
+    sim = Sim(tps=TPS)
+    log = InputLog.of(sim)
+sim.on_spawn.append(mob_spawned)
+sim.on_despawn.append(mob_despawned)
+for group in (sim.linear, sim.followers):
+    for i in range(group.n):
+        mob_spawned(group, i)
+if len(sys.argv) > 1:
+    replay = Replay(log, sim=sim)
+
+# b: 자동 조종 켜기/끄기 (입력 기록에는 자동 조종의 입력이 남음)
+autopilot = SimpleNamespace(bot=Autopilot(sim), on=False)
+
+player_id = draw_circle(sim.player.pos, PLAYER_SIZE, PLAYER_SHAPE)
 
 key_set = set()
 root.bind('<KeyPress>', key_press)
 root.bind('<KeyRelease>', key_release)
 
-lock = Lock()
-
-for _ in range(MOB_LINEAR_N):
-    MobLinear()
-
-spawner = Spawner(MobFollower, 100, 100)
-
 timer = SimpleNamespace(id=canvas.create_text(WIDTH / 2, 12, text='0.00s',
                                               font=('맑은 고딕', 12), fill='yellow'),
-                        t=0)
-
-gameover = False
-next_frame()
+                        title=0)
+
+canvas.create_text(WIDTH / 2, HEIGHT / 2 - 20,
+                   text='YOU DIED',
+                   font=('맑은 고딕', 50), fill='red',
+                   tags='end', state='hidden')
+canvas.create_text(WIDTH / 2, HEIGHT / 2 + 45,
+                   text='PRESS R TO RESTART',
+                   font=('맑은 고딕', 15), fill='yellow',
+                   tags='end', state='hidden')
+
+overlay = SimpleNamespace(id=canvas.create_text(6, 6, anchor='nw', state='hidden',
+                                                font=('Consolas', 9), fill='light green'),
+                          shown=False)
+
+loop = Loop(root, tick, render, 1 / sim.tps, MAX_TICKS, SPF)
+loop.start()
 root.mainloop()
@@ -0,0 +1,124 @@
+import argparse
+import random
+import time
+from itertools import cycle
+
+from lib.sim import Sim, FPS
+from lib.replay import InputLog, Replay
+from lib.bot import Autopilot
+
+"""
+Input script
+
+한 줄에 '<틱 수> <키>' (키: w, a, s, d 의 조합, 아무것도 안 누르면 -)
+틱 수는 FPS 기준이며 다른 틱 속도로 돌릴 때는 같은 시간이 되도록 환산
+스크립트 끝에 도달하면 처음부터 반복
+
+100 d
+50 wd
+30 -
+"""
+
+KEYS = 'wasd'  # 비트 순서 = lib.sim.KEY_DIRECTION
+
+
+def keys_to_mask(keys):
+    return sum(1 << KEYS.index(k) for k in set(keys) if k in KEYS)
+
+def read_script(path):
+    res = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#')[0].split()
+            if line:
+                res.append((int(line[0]), keys_to_mask(line[1] if len(line) > 1 else '')))
+    return res
+
+def random_script(seed):
+    # 스크립트가 없으면 seed로 정해지는 무작위 입력
+    rng = random.Random(seed)
+    while True:
+        yield rng.randint(2, 6) * 10, rng.randrange(16)
+
+def inputs(script, scale=1):
+    # 구간 경계를 FPS 기준 시간으로 누적해서 반올림 (틱 속도가 달라도 같은 시각에 입력이 바뀜)
+    t = 0
+    ticks = 0
+    for n, mask in script:
+        t += n
+        end = round(t / scale)
+        for _ in range(end - ticks):
+            yield mask
+        ticks = end
+
+
+def run(seed, script=None, max_time=600, tps=FPS, swept=True, log=None, bot=False):
+    # log: InputLog을 주면 틱마다의 입력을 기록
+    # bot: 스크립트 대신 Autopilot이 입력
+    sim = Sim(seed, tps, swept)
+    if bot:
+        stream = Autopilot(sim)
+    else:
+        stream = inputs(cycle(script) if script else random_script(seed), sim.scale)
+
+    max_ticks = max_time * tps
+    while sim.ticks < max_ticks:
+        mask = next(stream)
+        if log is not None:
+            log.append(mask)
+        if not sim.tick(mask):
+            break
+
+    return sim
+
+def replay(path, seek=None):
+    log = InputLog.load(path)
+    rep = Replay(log)
+
+    t = time.perf_counter()
+    if seek is None:
+        rep.run()
+    else:
+        rep.seek(seek)
+    t = time.perf_counter() - t
+
+    sim = rep.sim
+    print(f'{path}: seed {log.seed}, {len(log)} ticks in {len(log.runs)} runs '
+          f'({len(log.to_bytes())} bytes)')
+    print(f'{"died" if sim.over else "alive"} at tick {sim.ticks} ({sim.time:.2f}s), '
+          f'mobs {sim.linear.n + sim.followers.n}, {sim.ticks / t:.0f} ticks/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='run dodge without a display')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-n', '--games', type=int, default=1)
+    parser.add_argument('--script', help='input script (random input if omitted)')
+    parser.add_argument('--max-time', type=float, default=600, help='seconds of game time')
+    parser.add_argument('--tps', type=int, default=FPS, help='simulation ticks per second')
+    parser.add_argument('--discrete', action='store_true', help='overlap test at ticks instead of swept')
+    parser.add_argument('--bot', action='store_true', help='autopilot instead of script')
+    parser.add_argument('--record', metavar='PATH', help='save input log of each game ({seed} in PATH is replaced)')
+    parser.add_argument('--replay', metavar='PATH', help='re-simulate a saved input log at full speed')
+    parser.add_argument('--seek', type=int, help='with --replay, stop at this tick')
+    args = parser.parse_args()
+
+    if args.replay:
+        replay(args.replay, args.seek)
+        raise SystemExit
+
+    script = read_script(args.script) if args.script else None
+
+    total = 0
+    t = time.perf_counter()
+    for seed in range(args.seed, args.seed + args.games):
+        log = InputLog(seed, args.tps, not args.discrete) if args.record else None
+        sim = run(seed, script, args.max_time, args.tps, not args.discrete, log, args.bot)
+        if log is not None:
+            log.save(args.record.format(seed=seed))
+        total += sim.ticks
+        print(f'seed {seed}: {"died" if sim.over else "alive"} at tick {sim.ticks} '
+              f'({sim.time:.2f}s), mobs {sim.linear.n + sim.followers.n}')
+    t = time.perf_counter() - t
+
+    print(f'{total} ticks in {t:.2f}s, {total / t:.0f} ticks/s')
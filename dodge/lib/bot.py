@@ -0,0 +1,140 @@
+from time import perf_counter
+
+import numpy as np
+
+import lib.sim
+from lib.sim import DIRECTIONS
+
+"""
+Autopilot
+
+후보 방향(가만히 + 8방향)마다 그 방향을 horizon 틱 동안 유지한다고 보고
+몹들의 미래 위치를 한꺼번에 예측해서 위험도가 가장 낮은 방향을 고름
+
+  직선 몹: LinearMobs.at으로 k 틱 뒤 위치를 바로 계산
+  추적 몹: 후보마다 그 후보의 플레이어 경로를 향해 조향 (C, F, 2) 배열로 함께 진행
+
+위험도 = sum_k DECAY^k * (몹마다 exp(-(거리 - 충돌 거리)^2 / SIGMA^2)
+                           + 충돌 거리 안이면 HIT + 벽 근처면 WALL)
+
+틱마다 budget 초 안에 끝나야 함. 예측 도중 시간이 다 되면 거기까지의 점수로 결정하고
+다음 틱부터 horizon을 줄임 (여유가 있으면 다시 늘림)
+"""
+
+# 서로 다른 방향의 마스크만 (lib.sim.KEY_DIRECTION 비트: 위, 왼쪽, 아래, 오른쪽)
+CANDIDATES = [0, 1, 2, 4, 8, 1 | 2, 1 | 8, 2 | 4, 4 | 8]
+
+HORIZON = 40  # 틱 (FPS 기준)
+HORIZON_MIN = 5
+BUDGET = 0.002  # 초
+
+SIGMA = 12
+DECAY = 0.95
+HIT = 100
+HIT_MARGIN = 1
+WALL = 2
+WALL_SIGMA = 15
+
+
+def norm(v):
+    # lib.mobs.norm의 임의 차원 버전
+    length = np.hypot(v[..., 0], v[..., 1])[..., None]
+    return np.divide(v, length, out=np.zeros_like(v), where=length > 0)
+
+
+class Autopilot:
+    """sim을 보고 틱마다 입력 마스크를 돌려줌 (bot() 또는 next(bot))"""
+
+    def __init__(self, sim, horizon=HORIZON, budget=BUDGET):
+        self.sim = sim
+        self.horizon = max(HORIZON_MIN, round(horizon / sim.scale))
+        self.horizon_max = self.horizon
+        self.budget = budget
+
+        self.directions = np.array([DIRECTIONS[m] for m in CANDIDATES])
+        # 크기와 화면 크기는 lib.sim에서 실행 시점에 읽음 (soak.py --set으로 바꿀 수 있음)
+        self.reach = lib.sim.PLAYER_SIZE + lib.sim.MOB_SIZE
+
+        # 충돌 판정과 같은 플레이어 이동 범위 (Player.next_frame)
+        self.lo = lib.sim.PLAYER_SIZE + 2
+        self.hi = np.array((lib.sim.WIDTH, lib.sim.HEIGHT)) - lib.sim.PLAYER_SIZE + 1
+
+        self.overruns = 0  # 시간 안에 전체 horizon을 못 본 틱 수
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self()
+
+    def nearby(self, horizon):
+        # horizon 동안 플레이어에게 닿을 수 있는 몹만 (직선 몹은 wrap-around 거리로)
+        sim = self.sim
+        scale = sim.scale
+        player = np.array(sim.player.pos)
+        reach = self.reach + SIGMA * 2 + horizon * scale * (
+            lib.sim.PLAYER_SPEED + max(lib.sim.MOB_LINEAR_SPEED_MAX, lib.sim.MOB_FOLLOWER_SPEED))
+
+        linear = sim.linear
+        delta = np.abs(linear.pos[:linear.n] - player)
+        delta = np.minimum(delta, linear.period - delta)
+        li = np.flatnonzero(np.hypot(delta[:, 0], delta[:, 1]) <= reach)
+
+        followers = sim.followers
+        delta = followers.pos[:followers.n] - player
+        fi = np.flatnonzero(np.hypot(delta[:, 0], delta[:, 1]) <= reach)
+
+        return li, fi
+
+    def __call__(self):
+        start = perf_counter()
+        deadline = start + self.budget
+        sim = self.sim
+        scale = sim.scale
+        speed = lib.sim.PLAYER_SPEED * scale
+        acc = lib.sim.MOB_FOLLOWER_ACC * scale
+        follower_speed = lib.sim.MOB_FOLLOWER_SPEED * scale
+
+        li, fi = self.nearby(self.horizon)
+
+        n = len(CANDIDATES)
+        fpos = np.repeat(sim.followers.pos[fi][None], n, axis=0)
+        heading = np.repeat(sim.followers.heading[fi][None], n, axis=0)
+        player = np.repeat(np.array(sim.player.pos)[None], n, axis=0)
+        step = self.directions * speed
+
+        score = np.zeros(n)
+        weight = 1.
+        k = 0
+        while k < self.horizon:
+            k += 1
+            player = np.clip(player + step, self.lo, self.hi)
+
+            mobs = sim.linear.at(sim.ticks + k, li)
+            heading = norm(heading + norm(player[:, None] - fpos) * acc)
+            fpos = fpos + heading * follower_speed
+
+            d = np.concatenate((np.hypot(*(mobs[None] - player[:, None]).transpose(2, 0, 1)),
+                                np.hypot(*(fpos - player[:, None]).transpose(2, 0, 1))), axis=1)
+            gap = np.maximum(d - self.reach, 0)
+            danger = np.exp(-(gap / SIGMA) ** 2).sum(axis=1)
+            danger += HIT * (d <= self.reach + HIT_MARGIN).any(axis=1)
+
+            wall = np.minimum(player - self.lo, self.hi - player).min(axis=1)
+            danger += WALL * np.exp(-(wall / WALL_SIGMA) ** 2)
+
+            score += weight * danger
+            weight *= DECAY
+
+            if perf_counter() > deadline:
+                break
+
+        # 다음 틱의 horizon 조절
+        elapsed = perf_counter() - start
+        if k < self.horizon:
+            self.overruns += 1
+            self.horizon = max(HORIZON_MIN, k)
+        elif elapsed < self.budget / 2 and self.horizon < self.horizon_max:
+            self.horizon += 1
+
+        return CANDIDATES[int(np.argmin(score))]
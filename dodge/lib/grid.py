@@ -0,0 +1,69 @@
+import numpy as np
+
+
+# 칸 좌표를 하나의 정수 키로: (kx + OFFSET) * STRIDE + (ky + OFFSET)
+STRIDE = 1 << 20
+OFFSET = 1 << 19
+
+# pairs()에서 중복 없이 이웃 칸을 한 번씩만 보기 위한 절반의 이웃
+HALF_NEIGHBORS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def expand(lo, hi):
+    # 각 i에 대해 [lo[i], hi[i]) 범위를 펼쳐 (i, j) 쌍으로
+    count = hi - lo
+    a = np.repeat(np.arange(len(lo)), count)
+    start = np.repeat(lo - np.cumsum(count) + count, count)
+    b = start + np.arange(len(a))
+    return a, b
+
+
+class Grid:
+    """
+    균일 공간 해시 격자
+
+    cell 크기를 충돌 거리 이상으로 잡으면 충돌 후보는 자기 칸과 주변 8칸에만 있음
+    키를 정렬해 두고 이분 탐색하므로 질의 비용은 전체 개수와 무관함
+    floor를 쓰므로 wrap-around 후의 음수 좌표(-size 까지)도 -1 칸으로 들어감
+    """
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.order = np.empty(0, np.intp)
+        self.keys = np.empty(0, np.int64)
+
+    def key(self, pos):
+        k = np.floor(np.asarray(pos) / self.cell).astype(np.int64) + OFFSET
+        return k[..., 0] * STRIDE + k[..., 1]
+
+    def rebuild(self, pos):
+        keys = self.key(pos)
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def near(self, pos):
+        k = self.key(pos)
+        # 같은 x 열의 세 칸은 키가 연속이므로 열마다 범위 하나
+        ranges = [np.searchsorted(self.keys, (k + dx*STRIDE - 1, k + dx*STRIDE + 2))
+                  for dx in (-1, 0, 1)]
+        return np.concatenate([self.order[lo:hi] for lo, hi in ranges])
+
+    def pairs(self):
+        keys = self.keys
+        n = len(keys)
+
+        # 같은 칸: 정렬된 순서에서 자기 뒤쪽만
+        lo = np.arange(1, n + 1)
+        hi = np.searchsorted(keys, keys, 'right')
+        a, b = expand(lo, hi)
+
+        res_a = [a]
+        res_b = [b]
+        for dx, dy in HALF_NEIGHBORS:
+            target = keys + dx*STRIDE + dy
+            a, b = expand(np.searchsorted(keys, target, 'left'),
+                          np.searchsorted(keys, target, 'right'))
+            res_a.append(a)
+            res_b.append(b)
+
+        return self.order[np.concatenate(res_a)], self.order[np.concatenate(res_b)]
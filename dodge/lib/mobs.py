@@ -0,0 +1,172 @@
+import numpy as np
+
+from lib.vector import Vector
+
+
+def norm(v):
+    # Vector.norm과 같이 길이가 0이면 (0, 0)
+    length = np.hypot(v[:, 0], v[:, 1])[:, None]
+    return np.divide(v, length, out=np.zeros_like(v), where=length > 0)
+
+
+class Mob:
+    __slots__ = ('group', 'i')
+
+    def __init__(self, group, i):
+        self.group = group
+        self.i = i
+
+    @property
+    def pos(self):
+        return Vector(*self.group.pos[self.i].tolist())
+
+    @property
+    def id(self):
+        return int(self.group.ids[self.i])
+
+
+class MobGroup:
+    """
+    몹 종류 하나의 상태를 structure-of-arrays로 보관
+
+    행 i가 몹 하나, 앞쪽 n행만 유효. 배열은 용량이 부족할 때 두 배로 늘림
+    """
+
+    FIELDS = ('pos', 'pos_b', 'ids')
+
+    # 한 틱에 이보다 많이 움직였으면 wrap-around로 보고 보간하지 않음
+    JUMP = 50
+
+    def __init__(self, size, capacity=64):
+        self.size = size
+        self.n = 0
+        self.pos = np.zeros((capacity, 2))
+        self.pos_b = np.zeros((capacity, 2))
+        self.ids = np.zeros(capacity, np.int64)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return Mob(self, i)
+
+    def __iter__(self):
+        return (Mob(self, i) for i in range(self.n))
+
+    def grow(self):
+        for field in self.FIELDS:
+            a = getattr(self, field)
+            b = np.zeros((len(a) * 2,) + a.shape[1:], a.dtype)
+            b[:len(a)] = a
+            setattr(self, field, b)
+
+    def add(self, id, **values):
+        if self.n == len(self.pos):
+            self.grow()
+
+        i = self.n
+        self.ids[i] = id
+        for field, value in values.items():
+            getattr(self, field)[i] = value
+        self.pos_b[i] = self.pos[i]
+        self.n += 1
+
+        return i
+
+    def clear(self):
+        self.n = 0
+
+    def remove(self, mask):
+        # mask가 True인 행을 지우고 나머지를 순서대로 앞으로 당김, 지운 몹의 ids 반환
+        n = self.n
+        keep = ~mask
+        removed = self.ids[:n][mask].tolist()
+        k = n - len(removed)
+        for field in self.FIELDS:
+            a = getattr(self, field)
+            a[:k] = a[:n][keep]
+        self.n = k
+        return removed
+
+    def state(self):
+        # 유효한 행들의 복사본 (스냅샷용)
+        return {field: getattr(self, field)[:self.n].copy() for field in self.FIELDS}
+
+    def load(self, state):
+        n = len(state['pos'])
+        while len(self.pos) < n:
+            self.grow()
+        for field, a in state.items():
+            getattr(self, field)[:n] = a
+        self.n = n
+
+    def save(self):
+        # 틱 직전 위치 (렌더링 보간용)
+        self.pos_b[:self.n] = self.pos[:self.n]
+
+    def lerp(self, alpha):
+        pos = self.pos[:self.n]
+        pos_b = self.pos_b[:self.n]
+        d = pos - pos_b
+        res = pos_b + d * alpha
+        jump = np.abs(d).max(axis=1) > self.JUMP
+        res[jump] = pos[jump]
+        return res
+
+
+class LinearMobs(MobGroup):
+    """
+    등속 직선 이동 + wrap-around 몹
+
+    생성 위치 origin, 틱당 속도 d, 생성 틱 born만 있으면 어느 틱의 위치든 바로 계산됨
+    pos는 마지막 step(t)의 at(t) 값 (충돌 검사와 렌더링용)
+    """
+
+    FIELDS = MobGroup.FIELDS + ('d', 'origin', 'born')
+
+    def __init__(self, size, width, height, capacity=64):
+        super().__init__(size, capacity)
+        self.d = np.zeros((capacity, 2))
+        self.origin = np.zeros((capacity, 2))
+        self.born = np.zeros(capacity, np.int64)
+        self.period = np.array((width + 2*size, height + 2*size), float)
+
+    def add(self, id, **values):
+        i = super().add(id, **values)
+        self.origin[i] = self.pos[i]
+        return i
+
+    def at(self, t, idx=slice(None)):
+        """
+        틱 t에서의 위치 (Vector.__mod__((width, height, size))와 같은 wrap-around)
+
+        t가 배열이면 앞쪽 차원으로 붙음: t.shape + (몹 수, 2)
+        idx로 일부 몹만 고를 수 있음
+        """
+        n = self.n
+        k = (np.asarray(t)[..., None] - self.born[:n][idx])[..., None]
+        pos = self.origin[:n][idx] + self.d[:n][idx] * k + self.size
+        np.mod(pos, self.period, out=pos)
+        pos -= self.size
+        return pos
+
+    def step(self, t):
+        self.pos[:self.n] = self.at(t)
+
+class FollowerMobs(MobGroup):
+    FIELDS = MobGroup.FIELDS + ('heading', 'born')
+
+    def __init__(self, size, capacity=64):
+        super().__init__(size, capacity)
+        self.heading = np.zeros((capacity, 2))
+        self.born = np.zeros(capacity, np.int64)
+
+    def step(self, target, acc, speed):
+        pos = self.pos[:self.n]
+        heading = self.heading[:self.n]
+
+        heading += norm(np.subtract(target, pos)) * acc
+        heading[:] = norm(heading)
+        pos += heading * speed
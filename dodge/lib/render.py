@@ -0,0 +1,141 @@
+import tkinter as tk
+
+import numpy as np
+
+
+class Batch:
+    """
+    한 프레임 동안의 캔버스 변경을 모아 Tcl 스크립트 하나로 실행
+
+    canvas.move / coords / itemconfig를 항목마다 부르면 호출마다 Tcl 왕복이 생기므로
+    flush()에서 tk.eval 한 번으로 처리. calls는 마지막 프레임의 Tcl 호출 수
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.path = canvas._w
+        self.lines = []
+
+        self.calls = 0
+        self._calls = 0
+
+    def coords(self, id, *xy):
+        self.lines.append(f'{self.path} coords {id} ' + ' '.join(f'{v:.2f}' for v in xy))
+
+    def circle(self, id, pos, r):
+        x, y = pos
+        self.lines.append(f'{self.path} coords {id} {x - r:.2f} {y - r:.2f} {x + r:.2f} {y + r:.2f}')
+
+    def circles(self, ids, pos, r):
+        if hasattr(ids, 'tolist'):
+            ids = ids.tolist()
+        if hasattr(pos, 'tolist'):
+            pos = pos.tolist()
+
+        line = self.path + ' coords %d %.2f %.2f %.2f %.2f'
+        self.lines += [line % (id, x - r, y - r, x + r, y + r) for id, (x, y) in zip(ids, pos)]
+
+    def move(self, tag, dx, dy):
+        # 태그가 같은 항목들은 명령 하나로 함께 이동
+        self.lines.append(f'{self.path} move {tag} {dx:.2f} {dy:.2f}')
+
+    def itemconfig(self, id, **kw):
+        self.lines.append(f'{self.path} itemconfigure {id} ' +
+                          ' '.join(f'-{k} {{{v}}}' for k, v in kw.items()))
+
+    def call(self, *args):
+        # 바로 실행해야 하는 호출(반환값이 필요한 경우 등)도 개수에 포함
+        self._calls += 1
+        return self.canvas.tk.call(*args)
+
+    def flush(self):
+        if self.lines:
+            self.canvas.tk.eval('\n'.join(self.lines))
+            self.lines = []
+            self._calls += 1
+
+        self.calls = self._calls
+        self._calls = 0
+
+
+class Pool:
+    """
+    숨겨 둔 캔버스 항목을 다시 쓰는 free-list
+
+    delete / create_oval 대신 state와 itemconfig만 바꾸므로 항목 수가 늘지 않음
+    """
+
+    def __init__(self, canvas, batch, tag=None):
+        self.canvas = canvas
+        self.batch = batch
+        self.tag = tag
+        self.free = []
+        self.created = 0
+
+    def get(self, shape):
+        if self.free:
+            id = self.free.pop()
+            self.batch.itemconfig(id, state='normal', **shape._asdict())
+            return id
+
+        self.created += 1
+        return self.canvas.create_oval(0, 0, 0, 0, **shape._asdict(), tag=self.tag)
+
+    def release(self, ids):
+        for id in ids:
+            self.batch.itemconfig(id, state='hidden')
+        self.free += ids
+
+
+class Raster:
+    """
+    작은 원을 많이 그릴 때 쓰는 래스터 경로
+
+    NumPy 버퍼에 원을 찍고 PPM으로 PhotoImage 하나에 올림 (프레임당 Tcl 호출 1회)
+    """
+
+    def __init__(self, canvas, width, height, bg='black'):
+        self.canvas = canvas
+        self.width = width
+        self.height = height
+        self.colors = {}
+        self.bg = self.rgb(bg)
+
+        self.buf = np.empty((height, width, 3), np.uint8)
+        self.buf[:] = self.bg
+        self.header = f'P6 {width} {height} 255\n'.encode()
+        self.stamps = {}
+
+        self.image = tk.PhotoImage(master=canvas, width=width, height=height)
+        self.id = canvas.create_image(0, 0, image=self.image, anchor='nw')
+        canvas.tag_lower(self.id)
+
+    def rgb(self, color):
+        if color not in self.colors:
+            self.colors[color] = tuple(c >> 8 for c in self.canvas.winfo_rgb(color))
+        return self.colors[color]
+
+    def stamp(self, r):
+        if r not in self.stamps:
+            k = int(r + 0.5)
+            dy, dx = np.mgrid[-k:k+1, -k:k+1]
+            inside = dx*dx + dy*dy <= r*r
+            self.stamps[r] = dy[inside], dx[inside]
+        return self.stamps[r]
+
+    def clear(self):
+        self.buf[:] = self.bg
+
+    def circles(self, pos, r, color):
+        dy, dx = self.stamp(r)
+
+        c = np.rint(pos).astype(np.intp)
+        ys = (c[:, 1, None] + dy).ravel()
+        xs = (c[:, 0, None] + dx).ravel()
+        ok = (0 <= xs) & (xs < self.width) & (0 <= ys) & (ys < self.height)
+        self.buf[ys[ok], xs[ok]] = self.rgb(color)
+
+    def flush(self, batch=None):
+        self.image.configure(data=self.header + self.buf.tobytes(), format='PPM')
+        if batch:
+            batch._calls += 1
@@ -0,0 +1,153 @@
+import struct
+from bisect import bisect_right
+
+import numpy as np
+
+from lib.sim import Sim
+
+"""
+Input log structure
+
+header: magic 'DGRL', version u8, swept u8, tps u16, seed i64, ticks u32 (little-endian)
+이후 같은 입력이 이어지는 구간(run)마다 varint 하나: count << 4 | mask
+  mask: 틱마다의 방향 4비트 (lib.sim.KEY_DIRECTION 순서)
+  varint: 7비트씩 하위부터, 최상위 비트가 1이면 다음 바이트가 이어짐
+
+입력이 자주 바뀌지 않으므로 보통 구간 하나가 1~2바이트
+"""
+
+MAGIC = b'DGRL'
+VERSION = 2  # 시뮬레이션 결과가 바뀌면 올림 (이전 기록은 같은 결과로 재생되지 않음)
+HEADER = struct.Struct('<4sBBHqI')
+
+SNAPSHOT_EVERY = 500  # 재생 중 이 틱마다 상태 스냅샷 저장
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+def read_varints(data, pos=0):
+    n = shift = 0
+    for b in data[pos:]:
+        n |= (b & 0x7f) << shift
+        shift += 7
+        if not b & 0x80:
+            yield n
+            n = shift = 0
+
+
+class InputLog:
+    """seed와 틱마다의 입력 마스크를 run-length로 기록"""
+
+    def __init__(self, seed, tps, swept=True):
+        # 헤더에 부호 있는 64비트로 저장 (음수 seed도 그대로)
+        if not -1 << 63 <= seed < 1 << 63:
+            raise ValueError(f'seed {seed} does not fit in 64 bits')
+        self.seed = seed
+        self.tps = tps
+        self.swept = swept
+        self.runs = []  # [count, mask]
+        self.ticks = 0
+
+    @classmethod
+    def of(cls, sim):
+        return cls(sim.seed, sim.tps, sim.swept)
+
+    def __len__(self):
+        return self.ticks
+
+    def append(self, mask):
+        if self.runs and self.runs[-1][1] == mask:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, mask])
+        self.ticks += 1
+
+    def masks(self):
+        # 틱마다의 마스크 배열
+        counts, masks = zip(*self.runs) if self.runs else ((), ())
+        return np.repeat(np.array(masks, np.uint8), counts)
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.swept, self.tps, self.seed, self.ticks))
+        for count, mask in self.runs:
+            write_varint(out, count << 4 | mask)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, swept, tps, seed, ticks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a dodge input log')
+
+        log = cls(seed, tps, bool(swept))
+        log.runs = [[n >> 4, n & 15] for n in read_varints(data, HEADER.size)]
+        log.ticks = sum(count for count, _ in log.runs)
+        if log.ticks != ticks:
+            raise ValueError(f'input log truncated: {log.ticks}/{ticks} ticks')
+        return log
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class Replay:
+    """
+    기록된 입력으로 Sim을 다시 돌림
+
+    지나간 SNAPSHOT_EVERY 틱마다 상태를 저장해 두고,
+    seek(t)는 t 이전의 가장 가까운 스냅샷에서 빨리 감기
+    """
+
+    def __init__(self, log, every=SNAPSHOT_EVERY, sim=None):
+        self.log = log
+        self.input = log.masks()
+        self.every = every
+
+        if sim is None:
+            sim = Sim(log.seed, log.tps, log.swept)
+        else:
+            sim.reset(log.seed)
+        self.sim = sim
+        self.snapshots = {0: self.sim.snapshot()}
+
+    @property
+    def ticks(self):
+        return self.sim.ticks
+
+    @property
+    def done(self):
+        return self.sim.over or self.sim.ticks >= len(self.input)
+
+    def step(self):
+        if self.done:
+            return False
+
+        self.sim.tick(int(self.input[self.sim.ticks]))
+        if self.sim.ticks % self.every == 0 and self.sim.ticks not in self.snapshots:
+            self.snapshots[self.sim.ticks] = self.sim.snapshot()
+        return not self.done
+
+    def run(self, ticks=None):
+        # ticks 틱까지 (None이면 끝까지) 최대한 빨리
+        end = len(self.input) if ticks is None else min(ticks, len(self.input))
+        while self.sim.ticks < end and self.step():
+            pass
+
+    def seek(self, ticks):
+        ticks = max(0, min(ticks, len(self.input)))
+        keys = sorted(self.snapshots)
+        nearest = keys[bisect_right(keys, ticks) - 1]
+        # 되감기거나, 앞으로 가더라도 저장된 스냅샷이 더 가까우면 거기서 시작
+        if self.sim.ticks > ticks or nearest > self.sim.ticks:
+            self.sim.restore(self.snapshots[nearest])
+        self.run(ticks)
@@ -0,0 +1,294 @@
+import random
+
+import numpy as np
+
+from lib.vector import Vector
+from lib.grid import Grid
+from lib.mobs import MobGroup, LinearMobs, FollowerMobs
+
+
+FPS = 100  # 아래 속도 상수들의 기준 틱 속도 (Sim(tps=...)로 바꾸면 환산됨)
+SPF = 1 / FPS
+
+WIDTH = 500
+HEIGHT = 500
+
+
+PLAYER_SIZE = 3
+PLAYER_SPEED = 1.5
+PLAYER_POS_INIT = Vector(WIDTH / 2, HEIGHT / 2)
+
+
+MOB_SIZE = 3
+
+MOB_LINEAR_SPEED_MIN = 0.5
+MOB_LINEAR_SPEED_MAX = 2.
+MOB_LINEAR_N = 50
+
+MOB_FOLLOWER_SPEED = 2.
+MOB_FOLLOWER_ACC = 0.015
+MOB_FOLLOWER_COOLTIME = 100
+MOB_FOLLOWER_INITTIME = 100
+MOB_FOLLOWER_LIFETIME = None  # 틱 (FPS 기준), None이면 FPS * 30
+MOB_CULL_MARGIN = 100  # 화면 밖으로 이만큼 나가면 제거
+
+GRID_CELL = None  # None이면 max(MOB_SIZE + PLAYER_SIZE, MOB_SIZE * 2)
+
+
+# 다른 상수에서 정해지는 값은 실행 시점에 (soak.py --set 등으로 바꾼 상수가 반영되도록)
+def grid_cell():
+    return GRID_CELL or max(MOB_SIZE + PLAYER_SIZE, MOB_SIZE * 2)
+
+def follower_lifetime():
+    return MOB_FOLLOWER_LIFETIME or FPS * 30
+
+
+# 입력 방향: 4비트 마스크 (key_direction 순서대로 위, 왼쪽, 아래, 오른쪽)
+KEY_DIRECTION = [(0, -1), (-1, 0), (0, 1), (1, 0)]
+
+def _directions():
+    res = []
+    for mask in range(16):
+        d = Vector(0, 0)
+        for k, direction in enumerate(KEY_DIRECTION):
+            if mask >> k & 1:
+                d += Vector(*direction)
+        res.append(d.norm())
+    return res
+
+DIRECTIONS = _directions()
+
+
+def swept_hit(p0, p1, m0, m1, r):
+    """
+    틱 동안 플레이어가 p0 -> p1, 몹들이 m0 -> m1로 등속 이동할 때
+    두 원의 중심 거리가 한 번이라도 r 이하가 되는지 (몹마다 bool)
+    마지막 차원이 (x, y), 앞쪽 차원은 broadcast
+    """
+    dm = m1 - m0
+    # wrap-around한 몹은 이동 경로 대신 도착 위치만 검사
+    wrapped = np.abs(dm).max(axis=-1) > MobGroup.JUMP
+    m0 = np.where(wrapped[..., None], m1, m0)
+    dm[wrapped] = 0
+
+    r0 = m0 - p0
+    v = dm - np.subtract(p1, p0)
+    vv = (v * v).sum(axis=-1)
+    t = np.divide(-(r0 * v).sum(axis=-1), vv, out=np.zeros_like(vv), where=vv > 0)
+    np.clip(t, 0, 1, out=t)
+
+    closest = r0 + v * t[..., None]
+    return np.hypot(closest[..., 0], closest[..., 1]) <= r
+
+
+class Player:
+    def __init__(self, speed=PLAYER_SPEED):
+        self.pos = PLAYER_POS_INIT
+        self.pos_b = self.pos
+        self.speed = speed
+
+    def next_frame(self, d):
+        self.pos_b = self.pos
+        d *= self.speed
+
+        # tkinter canvas jot bug
+        lc = 2
+        hc = -1
+        self.pos = (self.pos + d).bound(PLAYER_SIZE + lc,
+                                        PLAYER_SIZE + lc,
+                                        WIDTH - PLAYER_SIZE - hc,
+                                        HEIGHT - PLAYER_SIZE - hc)
+
+    def lerp(self, alpha):
+        return self.pos_b + (self.pos - self.pos_b) * alpha
+
+
+class Spawner:
+    def __init__(self, spawn, cooltime, inittime):
+        self.spawn = spawn
+
+        self.cooltime = cooltime
+        self.next = inittime
+
+    def next_frame(self):
+        self.next -= 1
+        if self.next <= 0:
+            self.next = self.cooltime
+
+            self.spawn()
+
+
+class Sim:
+    """
+    화면 없이 돌아가는 dodge 시뮬레이션 상태
+
+    모든 난수는 seed로 만든 self.rng에서 나오므로 같은 seed와 같은 입력이면 같은 결과
+    tps: 초당 틱 수. 속도와 시간 상수는 FPS 기준 값을 scale = FPS / tps 배로 환산
+    swept: 충돌을 틱 사이의 이동 경로로 검사 (틱 속도가 낮아도 지나쳐 버리지 않음)
+    on_spawn(group, i): 몹이 생길 때 호출 (렌더러가 캔버스 항목을 만들 때 사용)
+    on_despawn(group, ids): 몹이 사라질 때 그 몹들의 ids로 호출
+    """
+
+    def __init__(self, seed=None, tps=FPS, swept=True):
+        self.on_spawn = []
+        self.on_despawn = []
+
+        self.tps = tps
+        self.scale = FPS / tps
+        self.swept = swept
+
+        self.linear = LinearMobs(MOB_SIZE, WIDTH, HEIGHT)
+        self.followers = FollowerMobs(MOB_SIZE)
+
+        # 한 틱 동안 플레이어와 몹이 서로 가까워질 수 있는 최대 거리만큼 칸을 키움
+        reach = (PLAYER_SPEED + max(MOB_LINEAR_SPEED_MAX, MOB_FOLLOWER_SPEED)) * self.scale if swept else 0
+        self.grid = Grid(max(grid_cell() + reach, MOB_SIZE * 2))
+
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # 기록/재생을 위해 seed는 항상 정해 둠
+        if seed is None:
+            seed = random.randrange(1 << 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        self.player = Player(PLAYER_SPEED * self.scale)
+        for group in (self.linear, self.followers):
+            if group.n:
+                self.despawned(group, group.ids[:group.n].tolist())
+            group.clear()
+        self.spawner = Spawner(self.spawn_follower,
+                               self.ticks_of(MOB_FOLLOWER_COOLTIME),
+                               self.ticks_of(MOB_FOLLOWER_INITTIME))
+
+        self.ticks = 0
+        self.over = False
+
+        for _ in range(MOB_LINEAR_N):
+            self.spawn_linear()
+
+    def ticks_of(self, n):
+        # FPS 기준 틱 수를 이 Sim의 틱 수로
+        return max(1, round(n / self.scale))
+
+    def spawned(self, group, i):
+        for f in self.on_spawn:
+            f(group, i)
+
+    def despawned(self, group, ids):
+        for f in self.on_despawn:
+            f(group, ids)
+
+    def spawn_linear(self):
+        pos = Vector.rand_boundary(WIDTH, HEIGHT, self.rng)
+        d = Vector.rand(self.rng) * (self.rng.uniform(MOB_LINEAR_SPEED_MIN, MOB_LINEAR_SPEED_MAX) * self.scale)
+        self.spawned(self.linear, self.linear.add(0, pos=pos, d=d, born=self.ticks))
+
+    def spawn_follower(self):
+        pos = Vector.rand_boundary(WIDTH, HEIGHT, self.rng)
+        heading = Vector.rand(self.rng)
+        self.spawned(self.followers, self.followers.add(0, pos=pos, heading=heading, born=self.ticks))
+
+    def cull(self):
+        # 수명이 다했거나 화면 밖으로 멀리 나간 추적 몹 제거
+        f = self.followers
+        pos = f.pos[:f.n]
+        mask = self.ticks - f.born[:f.n] >= self.ticks_of(follower_lifetime())
+        mask |= (pos < -MOB_CULL_MARGIN).any(axis=1)
+        mask |= pos[:, 0] > WIDTH + MOB_CULL_MARGIN
+        mask |= pos[:, 1] > HEIGHT + MOB_CULL_MARGIN
+        if mask.any():
+            self.despawned(f, f.remove(mask))
+
+    def positions(self, field='pos'):
+        return np.concatenate((getattr(self.linear, field)[:self.linear.n],
+                               getattr(self.followers, field)[:self.followers.n]))
+
+    def hit(self):
+        # 플레이어 주변 칸의 몹만 확인
+        pos = self.positions()
+        self.grid.rebuild(pos)
+        idx = self.grid.near(self.player.pos)
+
+        if not self.swept:
+            near = pos[idx] - self.player.pos
+            return bool((np.hypot(near[:, 0], near[:, 1]) <= PLAYER_SIZE + MOB_SIZE).any())
+
+        return bool(swept_hit(self.player.pos_b, self.player.pos,
+                              self.positions('pos_b')[idx], pos[idx],
+                              PLAYER_SIZE + MOB_SIZE).any())
+
+    def linear_hits(self, path):
+        """
+        플레이어가 다음 틱들에 path[0], path[1], ... 에 있다고 할 때
+        직선 몹마다 처음 겹치는 틱 (겹치지 않으면 -1)
+        몹 위치는 LinearMobs.at으로 바로 계산하므로 틱을 진행하지 않음
+        """
+        path = np.asarray(path, float).reshape(-1, 2)
+        ticks = self.ticks + 1 + np.arange(len(path))
+        if not len(path) or not self.linear.n:
+            return np.full(self.linear.n, -1, ticks.dtype)
+        m1 = self.linear.at(ticks)
+        p1 = path[:, None]
+        r = PLAYER_SIZE + MOB_SIZE
+
+        if self.swept:
+            p0 = np.concatenate(([self.player.pos], path[:-1]))[:, None]
+            hit = swept_hit(p0, p1, self.linear.at(ticks - 1), m1, r)
+        else:
+            d = m1 - p1
+            hit = np.hypot(d[..., 0], d[..., 1]) <= r
+
+        return np.where(hit.any(axis=0), ticks[hit.argmax(axis=0)], -1)
+
+    def tick(self, mask):
+        if self.over:
+            return False
+
+        self.player.next_frame(DIRECTIONS[mask])
+        self.spawner.next_frame()
+
+        # 종류별로 모든 몹을 한 번에 이동
+        self.linear.save()
+        self.linear.step(self.ticks + 1)
+        self.followers.save()
+        self.followers.step(self.player.pos, MOB_FOLLOWER_ACC * self.scale, MOB_FOLLOWER_SPEED * self.scale)
+
+        self.ticks += 1
+        self.cull()
+
+        if self.hit():
+            self.over = True
+
+        return not self.over
+
+    def snapshot(self):
+        # 이 상태에서 같은 입력으로 이어 돌리면 처음부터 돌린 것과 같은 결과
+        return {'rng': self.rng.getstate(),
+                'player': (self.player.pos, self.player.pos_b),
+                'spawner': self.spawner.next,
+                'ticks': self.ticks,
+                'over': self.over,
+                'linear': self.linear.state(),
+                'followers': self.followers.state()}
+
+    def restore(self, snap):
+        self.rng.setstate(snap['rng'])
+        self.player.pos, self.player.pos_b = snap['player']
+        self.spawner.next = snap['spawner']
+        self.ticks = snap['ticks']
+        self.over = snap['over']
+
+        # 렌더러가 항목을 다시 잡도록 전부 despawn -> spawn
+        for name in ('linear', 'followers'):
+            group = getattr(self, name)
+            if group.n:
+                self.despawned(group, group.ids[:group.n].tolist())
+            group.load(snap[name])
+            for i in range(group.n):
+                self.spawned(group, i)
+
+    @property
+    def time(self):
+        return self.ticks / self.tps
@@ -10,13 +10,13 @@ def bound(x, lower, upper):
 class Vector(namedtuple('Vector', ['x', 'y'])):
     __slots__ = ()
 
-    def rand():
-        theta = rd.uniform(0, 2 * pi)
+    def rand(random=rd):
+        theta = random.uniform(0, 2 * pi)
         return Vector(cos(theta), sin(theta))
 
-    def rand_boundary(width, height):
-        sign = rd.choice((0, 1))
-        rng = rd.uniform(0, width + height)
+    def rand_boundary(width, height, random=rd):
+        sign = random.choice((0, 1))
+        rng = random.uniform(0, width + height)
         if rng < width:
             return Vector(rng, sign * height)
         else:
@@ -0,0 +1,86 @@
+import argparse
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+import lib.sim
+from headless import run
+from lib.sim import FPS
+
+"""
+Soak test
+
+Autopilot으로 여러 판을 병렬로 돌려 생존 시간 분포를 봄
+--set NAME=VALUE 로 lib.sim의 상수(난이도)를 바꿔서 비교
+
+python soak.py -n 200 --max-time 300 --set MOB_LINEAR_N=80 --set MOB_FOLLOWER_COOLTIME=50
+"""
+
+PERCENTILES = (10, 25, 50, 75, 90)
+SURVIVAL_AT = 6  # 생존 곡선을 max_time의 몇 등분마다 보여줄지
+
+
+def init_worker(overrides):
+    # 각 워커의 lib.sim 상수를 바꿈 (Sim과 Autopilot이 실행 시점에 읽음)
+    for name, value in overrides.items():
+        setattr(lib.sim, name, value)
+
+def play(job):
+    seed, max_time, tps = job
+    sim = run(seed, None, max_time, tps, bot=True)
+    return seed, sim.time if sim.over else None, sim.ticks
+
+
+def parse_override(text):
+    name, value = text.split('=')
+    if not hasattr(lib.sim, name):
+        raise argparse.ArgumentTypeError(f'lib.sim has no {name}')
+    # 원래 상수의 타입으로 (정수 상수에 소수를 주면 잘라 버리지 않고 거부, None이면 실수)
+    kind = type(getattr(lib.sim, name))
+    try:
+        value = int(value) if kind is int else float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{name} needs {"an integer" if kind is int else "a number"}, not {value!r}')
+    return name, value
+
+
+def report(results, max_time, t):
+    times = np.array([max_time if death is None else death for _, death, _ in results])
+    died = sum(death is not None for _, death, _ in results)
+    ticks = sum(r[2] for r in results)
+
+    print(f'games: {len(results)}  died: {died} ({died / len(results):.1%})  '
+          f'mean: {times.mean():.2f}s  ticks/s: {ticks / t:.0f}')
+    print('percentiles: ' + '  '.join(f'p{p}: {v:.2f}s' for p, v in
+                                      zip(PERCENTILES, np.percentile(times, PERCENTILES))))
+    print('survival:    ' + '  '.join(f'{s:.0f}s: {(times >= s).mean():.1%}' for s in
+                                      np.linspace(0, max_time, SURVIVAL_AT + 1)[1:]))
+
+    worst = sorted((death, seed) for seed, death, _ in results if death is not None)[:5]
+    if worst:
+        print('shortest: ' + '  '.join(f'seed {seed} ({death:.2f}s)' for death, seed in worst))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='run many autopilot dodge games and report survival times')
+    parser.add_argument('-n', '--games', type=int, default=100)
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-time', type=float, default=120, help='seconds of game time')
+    parser.add_argument('--tps', type=int, default=FPS)
+    parser.add_argument('--set', type=parse_override, action='append', default=[], metavar='NAME=VALUE',
+                        help='override a lib.sim constant')
+    args = parser.parse_args()
+
+    overrides = dict(args.set)
+    jobs = [(seed, args.max_time, args.tps) for seed in range(args.seed, args.seed + args.games)]
+
+    t = time.perf_counter()
+    with Pool(args.workers, init_worker, (overrides,)) as pool:
+        results = pool.map(play, jobs, chunksize=1)
+    t = time.perf_counter() - t
+
+    if overrides:
+        print(', '.join(f'{name}={value}' for name, value in overrides.items()))
+    report(results, args.max_time, t)
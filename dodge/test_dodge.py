@@ -0,0 +1,14 @@
+import numpy as np
+
+from lib.sim import Sim
+
+
+def test_linear_hits_with_empty_path():
+    sim = Sim(seed=1)
+    hits = sim.linear_hits([])
+    assert len(hits) == sim.linear.n and (hits == -1).all()
+
+def test_linear_hits_without_linear_mobs():
+    sim = Sim(seed=1)
+    sim.linear.remove(np.ones(sim.linear.n, bool))
+    assert len(sim.linear_hits([sim.player.pos] * 3)) == 0
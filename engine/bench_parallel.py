@@ -0,0 +1,101 @@
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from lib.bodies import Bodies, MARGIN
+from lib.grid import Grid
+from lib.parallel import ParallelSolver
+from lib.world import World, CENTER_XY as CENTER, R, GRAVITY as G
+from lib import snapshot
+
+
+def candidate_pairs(grid, bodies):
+    grid.rebuild(bodies.pos[:bodies.n])
+    return grid.pairs()
+
+def pile(n, r, frames, seed=0):
+    # 용기 안에 무작위로 뿌리고 가라앉힘
+    rng = np.random.default_rng(seed)
+    bodies = Bodies(r, n)
+    theta = rng.uniform(0, 2 * np.pi, n)
+    dist = (R - r) * np.sqrt(rng.uniform(0, 1, n))
+    for p in CENTER + np.stack((np.cos(theta), np.sin(theta)), axis=1) * dist[:, None]:
+        bodies.add(p)
+
+    grid = Grid(r * 2 * MARGIN)
+    for _ in range(frames):
+        step(bodies, grid, bodies.solve)
+    return bodies, grid
+
+def load(path):
+    # 스냅샷의 공들 (깨어 있는 상태로 비교)
+    with open(path, 'rb') as f:
+        world = World(ball_r=snapshot.read_header(f.read(snapshot.HEADER.size))['ball_r'])
+    world.restore(path)
+    bodies = world.bodies
+    bodies.awake[:bodies.n] = True
+    return bodies, Grid(bodies.r * 2 * MARGIN)
+
+def step(bodies, grid, solve):
+    bodies.integrate(G)
+    bodies.constrain(CENTER, R - bodies.r)
+    solve(*candidate_pairs(grid, bodies))
+
+def copy(bodies):
+    res = Bodies(bodies.r, len(bodies.pos))
+    for field in Bodies.FIELDS:
+        getattr(res, field)[:] = getattr(bodies, field)
+    res.n = bodies.n
+    return res
+
+def digest(bodies):
+    return hashlib.sha1(bodies.pos[:bodies.n].tobytes()).hexdigest()[:12]
+
+def run(start, grid, frames, solve=None, solver=None):
+    bodies = copy(start)
+    t = 0.
+    for _ in range(frames):
+        bodies.integrate(G)
+        bodies.constrain(CENTER, R - bodies.r)
+        a, b = candidate_pairs(grid, bodies)
+        s = time.perf_counter()
+        if solver:
+            solver.solve(bodies, a, b)
+        else:
+            bodies.solve(a, b)
+        t += time.perf_counter() - s
+    return t / frames, digest(bodies)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='collision solve time with 1..N worker processes')
+    parser.add_argument('-n', '--balls', type=int, nargs='+', default=[2000, 5000, 10000])
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--settle', type=int, default=200, help='frames to settle the pile first')
+    parser.add_argument('--load', metavar='PATH', nargs='+', help='use snapshots instead of random piles')
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} cpus')
+    for arg in args.load or args.balls:
+        if args.load:
+            start, grid = load(arg)
+            n, r = start.n, start.r
+        else:
+            # 공 수가 많아도 용기에 들어가도록 반지름을 맞춤
+            n = arg
+            r = min(3, 0.85 * (R - 2) / np.sqrt(n))
+            start, grid = pile(n, r, args.settle)
+
+        t, h = run(start, grid, args.frames)
+        print(f'n={n:6} r={r:.2f}  serial      {t * 1000:7.2f}ms  {h}')
+
+        base = None
+        for workers in range(1, args.workers + 1):
+            with ParallelSolver(r, grid.cell, workers, n) as solver:
+                t, h = run(start, grid, args.frames, solver=solver)
+            base = base or t
+            print(f'{"":16}  {workers:2} workers  {t * 1000:7.2f}ms  {h}  x{base / t:.2f}')
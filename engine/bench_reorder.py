@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import numpy as np
+
+from bench_parallel import pile, copy, candidate_pairs
+from lib.bodies import close_pairs, solve
+from lib.world import R
+
+
+def morton_sorted(bodies, grid):
+    res = copy(bodies)
+    res.permute(np.argsort(grid.morton(res.pos[:res.n]), kind='stable'))
+    return res
+
+def best(f, repeat):
+    # 가장 빠른 시간 (ms)
+    times = []
+    for _ in range(repeat):
+        s = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - s)
+    return min(times) * 1000
+
+def measure(bodies, grid, repeat):
+    # 같은 상태에서 충돌 처리 한 번의 단계별 시간: 후보 쌍(격자), 가까운 쌍 고르기, 떼어 놓기
+    # 순서만 다르고 공간 배치는 같으므로 쌍의 수도 같음 (떼어 놓는 배치의 수는 번호에 따라 조금 다름)
+    a, b = candidate_pairs(grid, bodies)
+    close_a, close_b = close_pairs(bodies.pos, a, b, bodies.r)
+    return (best(lambda: candidate_pairs(grid, bodies), repeat),
+            best(lambda: close_pairs(bodies.pos, a, b, bodies.r), repeat),
+            best(lambda: solve(bodies.pos.copy(), close_a, close_b, bodies.r), repeat))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='collision pass time with and without Morton-order storage')
+    parser.add_argument('-n', '--balls', type=int, nargs='+', default=[20000, 100000, 300000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--settle', type=int, default=30, help='frames to settle the pile first')
+    args = parser.parse_args()
+
+    for n in args.balls:
+        # 공 수가 많아도 용기에 들어가도록 반지름을 맞춤
+        r = min(3, 0.85 * (R - 2) / np.sqrt(n))
+        start, grid = pile(n, r, args.settle)  # 뿌린 순서 그대로 (공간과 상관없는 순서)
+
+        base = None
+        for name, bodies in (('unordered', start), ('morton', morton_sorted(start, grid))):
+            times = measure(bodies, grid, args.repeat)
+            t = sum(times)
+            base = base or t
+            print(f'n={n:7}  {name:9}  grid {times[0]:7.1f}ms  close {times[1]:7.1f}ms  '
+                  f'solve {times[2]:7.1f}ms  {n / t / 1e3:5.2f}M balls/s  x{base / t:.2f}')
@@ -0,0 +1,98 @@
+import argparse
+import time
+
+import numpy as np
+
+from bench_parallel import pile, candidate_pairs
+from lib.bodies import close_pairs, solve
+from lib.world import CENTER_XY as CENTER, R, GRAVITY as G
+
+"""
+가라앉은 더미에서 충돌 처리 한 번의 결과를 예전 이중 루프(모든 쌍을 (i, j) 순서로)와 비교
+
+  ordered: solve(ordered=True), 이중 루프와 같은 순서 -> 부동소수점 오차 수준으로 같아야 함
+  hash:    solve의 기본 순서. 쌍을 처리하는 순서만 다르므로 위치가 조금 다름
+           공마다 위치 차이가 반지름의 HASH_TOLERANCE배 이내, 남은 겹침이 OVERLAP_TOLERANCE 비율 이내
+
+더미는 엔진처럼 틱마다 SUBSTEPS 단계, 단계마다 ITERATIONS번 충돌 처리로 가라앉힘
+(한 번만 처리하면 더미가 눌려서 반지름 가까이 겹치고, 그때는 어느 순서든 공 몇 개가 크게 달라짐)
+"""
+
+SUBSTEPS = 4
+ITERATIONS = 2
+
+ORDERED_TOLERANCE = 1e-9  # px
+HASH_TOLERANCE = 0.25  # 반지름 비율
+OVERLAP_TOLERANCE = 0.1
+
+
+def settle(n, r, ticks):
+    bodies, grid = pile(n, r, 0)
+    for _ in range(ticks):
+        for _ in range(SUBSTEPS):
+            bodies.integrate(G / SUBSTEPS**2)
+            bodies.constrain(CENTER, R - r)
+            a, b = candidate_pairs(grid, bodies)
+            for _ in range(ITERATIONS):
+                bodies.solve(a, b)
+    # 충돌 처리 직전 상태 (적분과 용기 검사까지)
+    bodies.integrate(G / SUBSTEPS**2)
+    bodies.constrain(CENTER, R - r)
+    return bodies, grid
+
+def nested_loop(pos, r):
+    # 예전 engine.py의 충돌 처리 그대로 (공 하나씩, 뒤쪽 공 전부와)
+    pos = pos.tolist()
+    r2 = r * 2
+    for i, (x1, y1) in enumerate(pos):
+        for j in range(i + 1, len(pos)):
+            x2, y2 = pos[j]
+            dx, dy = x1 - x2, y1 - y2
+            d = (dx * dx + dy * dy) ** 0.5
+            if d < r2:
+                k = (r - d / 2) / d
+                x1, y1 = x1 + dx * k, y1 + dy * k
+                pos[j] = [x2 - dx * k, y2 - dy * k]
+        pos[i] = [x1, y1]
+    return np.array(pos)
+
+def overlap(pos, r):
+    # 겹친 쌍의 평균 겹침 (px)
+    i, j = np.triu_indices(len(pos), 1)
+    d = pos[i] - pos[j]
+    over = r * 2 - np.hypot(d[:, 0], d[:, 1])
+    over = over[over > 0]
+    return over.mean() if len(over) else 0.
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='compare one collision pass with the old nested-loop resolver')
+    parser.add_argument('-n', '--balls', type=int, nargs='+', default=[500, 1000, 2000])
+    parser.add_argument('--settle', type=int, default=300, help='ticks to settle the pile first')
+    args = parser.parse_args()
+
+    for n in args.balls:
+        r = min(5, 0.85 * (R - 2) / np.sqrt(n))
+        bodies, grid = settle(n, r, args.settle)
+        before = bodies.pos[:n].copy()
+
+        t = time.perf_counter()
+        ref = nested_loop(before, r)
+        ref_t = time.perf_counter() - t
+        print(f'n={n:5}  r={r:.2f}  overlap before {overlap(before, r):.4f}px  '
+              f'nested loop {overlap(ref, r):.4f}px ({ref_t * 1000:.0f}ms)')
+
+        a, b = close_pairs(bodies.pos, *candidate_pairs(grid, bodies), r)
+        for name, ordered in (('ordered', True), ('hash', False)):
+            pos = before.copy()
+            t = time.perf_counter()
+            solve(pos, a, b, r, ordered=ordered)
+            t = time.perf_counter() - t
+            diff = np.hypot(*(pos - ref).T)
+            print(f'  {name:8} overlap {overlap(pos, r):.4f}px  diff max {diff.max():.2e}px '
+                  f'mean {diff.mean():.2e}px  ({t * 1000:.1f}ms)')
+            if ordered:
+                assert diff.max() <= ORDERED_TOLERANCE, f'{name}: {diff.max()}px'
+            else:
+                assert diff.max() <= HASH_TOLERANCE * r, f'{name}: {diff.max()}px'
+                assert abs(overlap(pos, r) / overlap(ref, r) - 1) <= OVERLAP_TOLERANCE
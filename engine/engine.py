@@ -1,105 +1,220 @@
+import sys
+import time
 import tkinter as tk
-from threading import Lock
 from collections import namedtuple
+from pathlib import Path
+from types import SimpleNamespace
 
-from lib.vector import Vector
-
-
-MSPF = 10
-G = Vector(0, 0.1)
+import numpy as np
 
-WIDTH = 500
-HEIGHT = 500
-
-CENTER = Vector(WIDTH / 2, HEIGHT / 2)
-R = 200
+from lib.world import (World, WIDTH, HEIGHT, CENTER, R, BALL_R, BALL_N, MSPF,
+                       PHYSICS_BUDGET, field_of)
+from lib.vector import Vector
+from lib.render import Batch
+from lib.loop import Loop
+from lib.remote import RemoteWorld
+from lib.governor import Governor
 
 
-Shape = namedtuple('Shape', ['fill', 'outline', 'width'], defaults=('', 0))
+RENDER_FPS = 60  # 렌더링은 틱과 따로 이 속도로
+MAX_TICKS = 5  # 한 프레임에서 따라잡을 최대 틱 수
 
-BALL_R = 10
-BALL_R2 = BALL_R * 2
-BALL_SHAPE = Shape('white')
+# 충돌 처리를 나눠 맡을 프로세스 수 (0이면 이 프로세스에서, lib/parallel.py)
+WORKERS = 0
 
-BALL_COOLTIME = 20
-BALL_N = 100
+# 용기: None이면 원, 아니면 lib.world.CONTAINERS의 이름이나 PGM/PPM 그림 경로 (밝은 곳이 안쪽)
+CONTAINER = None
 
-R_B = R - BALL_R
+# 시뮬레이션을 별도 프로세스에서 돌리고 공유 메모리의 최신 프레임만 그림 (lib/remote.py)
+# 스페이스: 멈춤/계속, 위/아래: 충돌 처리 반복 수
+SEPARATE_PROCESS = True
 
+# 물리(틱 하나)가 MSPF * PHYSICS_BUDGET, 렌더링(프레임 하나)이 프레임 간격 * RENDER_BUDGET을
+# 넘으면 품질을 낮추고 여유가 생기면 되돌림 (lib/governor.py). 결정 기록은 끝날 때 TIMELINE_PATH에
+GOVERNOR = True
+RENDER_BUDGET = 0.5
+TIMELINE_PATH = Path('governor.log')
 
-class Ball:
-    def __init__(self, pos):
-        self.pos = pos
-        self.pos_b = pos  # 초기 속도
-        self.pos_draw = pos
-        self.id = draw_circle(self.pos, BALL_R, BALL_SHAPE)
+SNAPSHOT_DIR = Path(__file__).parent / 'snapshots'  # s 키로 저장 (python engine.py <스냅샷>으로 불러옴)
 
-        balls.append(self)
 
-    def next_pos(self):
-        self.pos, self.pos_b = 2*self.pos - self.pos_b + G, self.pos
-        d = self.pos - self.pos_draw
-        canvas.move(self.id, d.x, d.y)
-        self.pos_draw = self.pos
+Shape = namedtuple('Shape', ['fill', 'outline', 'width'], defaults=('', 0))
 
-    def constrain(self):
-        d = self.pos - CENTER
-        if abs(d) > R_B:
-            self.pos = CENTER + d.norm() * R_B
+BALL_SHAPE = Shape('white')
 
 
 def draw_circle(pos, size, shape):
     return canvas.create_oval(*pos.bbox(size), **shape._asdict())
 
-def next_frame():
-    global ball_next
-
-    with lock:
-        try:
-            id = root.after(MSPF, next_frame)
-
-            for ball in balls:
-                ball.next_pos()
-
-            for ball in balls:
-                ball.constrain()
-
-            # solve collision
-            for i, b1 in enumerate(balls):
-                for b2 in balls[i+1:]:
-                    d = b1.pos - b2.pos
-                    d_len = abs(d)
-                    if d_len < BALL_R2:
-                        dd = d * ((BALL_R - d_len/2) / d_len)
-                        b1.pos += dd
-                        b2.pos -= dd
-
-            if len(balls) < BALL_N:
-                ball_next -= 1
-                if ball_next <= 0:
-                    ball_next = BALL_COOLTIME
-                    Ball(Vector(400, 200))
-
-            root.update_idletasks()
-
-        except Exception as e:
-            root.after_cancel(id)
-            raise e
-
-
-root = tk.Tk()
-root.geometry(f'{WIDTH + 4}x{HEIGHT + 4}+1000+250')
-root.resizable(False, False)
-
-canvas = tk.Canvas(width=WIDTH, height=HEIGHT, bg='white')
-canvas.pack()
-
-draw_circle(CENTER, R, Shape('black'))
-
-balls = []
-
-lock = Lock()
-
-ball_next = 0
-next_frame()
-root.mainloop()
+def draw_field(field):
+    # 픽셀마다 phi를 읽어서 안쪽을 검게 (도형 종류와 상관없이)
+    y, x = np.mgrid[:HEIGHT, :WIDTH] + 0.5
+    phi, _ = field.lookup(np.stack((x.ravel(), y.ravel()), axis=1))
+    rgb = np.where(phi.reshape(HEIGHT, WIDTH, 1) > 0, 0, 255).repeat(3, axis=2).astype(np.uint8)
+    image = tk.PhotoImage(data=f'P6 {WIDTH} {HEIGHT} 255\n'.encode() + rgb.tobytes(), format='PPM')
+    canvas.create_image(0, 0, image=image, anchor='nw')
+    return image
+
+def ball_spawned(world, i):
+    world.bodies.ids[i] = draw_circle(world[i].pos, BALL_R, BALL_SHAPE)
+
+def draw_balls():
+    # 지난 프레임 뒤로 움직인 공만 (잠든 공은 그대로 둠)
+    bodies = world.bodies
+    dirty = np.flatnonzero(bodies.dirty[:bodies.n])
+    batch.circles(bodies.ids[dirty], bodies.pos[dirty], BALL_R)
+    bodies.dirty[dirty] = False
+
+def save_snapshot(e):
+    SNAPSHOT_DIR.mkdir(exist_ok=True)
+    ticks = view.ticks if SEPARATE_PROCESS else world.ticks
+    world.save(SNAPSHOT_DIR / f'{time.strftime("%Y%m%d-%H%M%S")}-{ticks}.bsnp')
+
+def draw_frame(frame):
+    # 새 공은 만들고, 지난 프레임에서 움직인 공만 옮김
+    n = len(frame.pos)
+    if n > len(view.ids):
+        new = [draw_circle(Vector(*p), BALL_R, BALL_SHAPE) for p in frame.pos[len(view.ids):].tolist()]
+        view.ids = np.concatenate((view.ids, new)).astype(np.int64)
+        view.pos = np.concatenate((view.pos, frame.pos[len(view.pos):]))
+
+    moved = np.flatnonzero((frame.pos != view.pos[:n]).any(axis=1))
+    batch.circles(view.ids[moved], frame.pos[moved], BALL_R)
+    batch.flush()
+    view.pos[:n] = frame.pos
+    view.ticks = frame.ticks
+    view.frame = frame
+
+    if frame.ticks // 100 != title.ticks:
+        title.ticks = frame.ticks // 100
+        frame_title()
+
+def frame_title():
+    frame = view.frame
+    if frame:
+        root.title(f'engine - balls: {len(frame.pos)} (awake {frame.awake}), substeps: {frame.substeps} '
+                   f'({frame.step_cost * 1000:.2f}ms), iterations: {view.iterations}, '
+                   f'frames: {world.frames} (dropped {world.dropped}, torn {world.torn}){quality()}'
+                   + (' [paused]' if world.paused else ''))
+
+def quality():
+    if not governor:
+        return ''
+    return (f', quality: {governor.physics_channel.level}/{governor.render_channel.level} '
+            f'(draw every {governor.decimation})')
+
+def remote_frame():
+    # 시뮬레이션 프로세스가 죽으면 latest()의 예외를 Tk가 한 번 출력하고 더 부르지 않음
+    frame = world.latest()
+    root.after(1000 // RENDER_FPS, remote_frame)
+    if not governor:
+        if frame:
+            draw_frame(frame)
+        return
+
+    # 물리 시간은 시뮬레이션 프로세스가 잰 값 (단계 하나의 평균 x 단계 수)
+    governor.frame(view.ticks)
+    if frame:
+        governor.physics(frame.step_cost * frame.substeps)
+    if frame and governor.draw():
+        t = time.perf_counter()
+        draw_frame(frame)
+        governor.render(time.perf_counter() - t)
+
+def set_quality(setting):
+    world.set(**setting)
+    if SEPARATE_PROCESS:
+        view.iterations = setting['iterations']
+        frame_title()
+
+def toggle_pause(e):
+    if world.paused:
+        world.resume()
+    else:
+        world.pause()
+    frame_title()
+
+def change_iterations(d):
+    view.iterations = max(1, view.iterations + d)
+    world.set(iterations=view.iterations)
+    if governor:
+        governor.rebase(world.settings())  # 직접 고른 값을 governor가 덮어쓰지 않도록
+    frame_title()
+
+def tick():
+    t = time.perf_counter()
+    world.step()
+    if governor:
+        governor.physics(time.perf_counter() - t)
+    return True
+
+def render(alpha):
+    # 움직인 공의 좌표를 Tcl 호출 한 번으로 반영 (보간 없이 마지막 틱 위치)
+    if governor:
+        governor.frame(world.ticks)
+        if not governor.draw():
+            return
+    t = time.perf_counter()
+    draw_balls()
+    batch.flush()
+    if governor:
+        governor.render(time.perf_counter() - t)
+
+    if world.ticks // 100 != title.ticks:
+        title.ticks = world.ticks // 100
+        root.title(f'engine - balls: {len(world)} (awake {world.awake}, asleep {world.asleep}), substeps: {world.substeps} '
+                   f'({world.step_cost * 1000:.2f}ms), Tcl calls/frame: {batch.calls}{quality()}')
+
+
+# 워커 프로세스가 이 파일을 다시 import해도 창을 만들지 않도록
+if __name__ == '__main__':
+    root = tk.Tk()
+    root.geometry(f'{WIDTH + 4}x{HEIGHT + 4}+1000+250')
+    root.resizable(False, False)
+
+    canvas = tk.Canvas(width=WIDTH, height=HEIGHT, bg='white')
+    canvas.pack()
+
+    batch = Batch(canvas)
+
+    field = field_of(CONTAINER)
+    if field:
+        field_image = draw_field(field)  # 참조를 잃으면 Tk가 그림을 지움
+    else:
+        draw_circle(CENTER, R, Shape('black'))
+
+    load = sys.argv[1] if len(sys.argv) > 1 else None
+    title = SimpleNamespace(ticks=0)
+    root.bind('s', save_snapshot)
+
+    if SEPARATE_PROCESS:
+        world = RemoteWorld(BALL_N, MSPF / 1000, load, workers=WORKERS, container=CONTAINER)
+        view = SimpleNamespace(ids=np.zeros(0, np.int64), pos=np.zeros((0, 2)), ticks=0,
+                               iterations=world.settings()['iterations'], frame=None)
+        root.bind('<space>', toggle_pause)
+        root.bind('<Up>', lambda e: change_iterations(1))
+        root.bind('<Down>', lambda e: change_iterations(-1))
+    else:
+        world = World(workers=WORKERS, container=field)
+        world.on_spawn.append(ball_spawned)
+        if load:
+            world.restore(load)
+
+    # 설정한 값에서 시작해서 예산을 넘을 때만 낮춤
+    governor = None
+    if GOVERNOR:
+        governor = Governor(MSPF / 1000 * PHYSICS_BUDGET, RENDER_BUDGET / RENDER_FPS,
+                            world.settings(), set_quality)
+        world.set(auto_budget=governor.auto_budget)  # 자동 단계 수가 예산을 다 채우지 않도록
+
+    if SEPARATE_PROCESS:
+        remote_frame()
+    else:
+        loop = Loop(root, tick, render, MSPF / 1000, MAX_TICKS, 1 / RENDER_FPS)
+        loop.start()
+
+    root.mainloop()
+
+    world.close()
+    if governor and governor.timeline:
+        governor.save(TIMELINE_PATH)
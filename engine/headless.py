@@ -0,0 +1,124 @@
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from lib.world import World, BALL_N, BALL_R, BALL_COOLTIME, ITERATIONS, MSPF, PHYSICS_BUDGET, REORDER_EVERY
+from lib.vector import Vector
+from lib.governor import Governor
+from lib import snapshot
+
+
+# --scaled: 용기 안에 공 수천 개 (작은 공을 2틱마다, 다음 공과 겹치지 않도록 옆으로 보내며 만듦)
+SCALED = dict(ball_n=2000, ball_r=3, ball_cooltime=2, ball_v=Vector(-3, 0))
+
+
+def overlap(world):
+    # 겹친 쌍들의 평균 겹친 깊이 (쌓인 공 더미가 얼마나 눌렸는지)
+    pos = world.bodies.pos[:len(world)]
+    r2 = world.bodies.r * 2
+    world.grid.rebuild(pos)
+    a, b = world.grid.pairs()
+    d = np.hypot(*(pos[a] - pos[b]).T)
+    depth = r2 - d[d < r2]
+    return depth.mean() if len(depth) else 0.
+
+def digest(world):
+    # 같은 상태인지 비트 단위로 비교할 때
+    bodies = world.bodies
+    h = hashlib.sha1(bodies.pos[:bodies.n].tobytes())
+    h.update(bodies.pos_b[:bodies.n].tobytes())
+    return h.hexdigest()[:12]
+
+def governed_step(world, governor, n):
+    # 틱마다 시간을 재서 governor에 (화면이 없으므로 틱 하나를 프레임 하나로)
+    for _ in range(n):
+        t = time.perf_counter()
+        world.step()
+        governor.physics(time.perf_counter() - t)
+        governor.frame(world.ticks)
+
+def run(ticks, report, load=None, save=None, budget=None, **params):
+    # ticks: 시작 상태(load가 있으면 스냅샷)에서 더 돌릴 틱 수
+    # budget: 틱 하나의 물리 예산 (초). 주면 lib/governor.py로 품질을 조절
+    world = World(**params)
+    governor = None
+    try:
+        if load:
+            t = time.perf_counter()
+            world.restore(load)
+            print(f'  loaded {load} (tick {world.ticks}, {len(world)} balls) '
+                  f'in {(time.perf_counter() - t) * 1000:.1f}ms')
+
+        if budget:
+            governor = Governor(budget, float('inf'), world.settings(), lambda setting: world.set(**setting))
+            world.set(auto_budget=governor.auto_budget)
+
+        end = world.ticks + ticks
+        t = time.perf_counter()
+        while world.ticks < end:
+            n = min(report, end - world.ticks)
+            if governor:
+                governed_step(world, governor, n)
+            else:
+                world.step(n)
+            now = time.perf_counter()
+            print(f'  tick {world.ticks:6}  balls {len(world):5}  awake {world.awake:5}  substeps {world.substeps}  '
+                  f'{n / (now - t):7.1f} ticks/s  overlap {overlap(world):.3f}')
+            t = now
+        print(f'  state {digest(world)}')
+        if governor:
+            print(governor.format_timeline())
+
+        if save:
+            world.save(save)
+    finally:
+        world.close()
+    return world
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='run the ball engine without a display')
+    parser.add_argument('--ticks', type=int, default=6000)
+    parser.add_argument('--report', type=int, default=1000, help='print every this many ticks')
+    parser.add_argument('--scaled', action='store_true',
+                        help=f'thousands of small balls: {", ".join(f"{k}={v}" for k, v in SCALED.items())}')
+    parser.add_argument('-n', '--balls', type=int, help=f'default: {BALL_N}')
+    parser.add_argument('-r', '--radius', type=float, help=f'default: {BALL_R}')
+    parser.add_argument('--cooltime', type=int, help=f'ticks between new balls (default: {BALL_COOLTIME})')
+    parser.add_argument('--substeps', type=int, nargs='+', default=[1], help='0 for automatic')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS)
+    parser.add_argument('-j', '--workers', type=int, default=0)
+    parser.add_argument('--no-sleep', dest='sleep', action='store_false', help='keep every ball awake')
+    parser.add_argument('--reorder', type=int, default=REORDER_EVERY,
+                        help='sort balls in Morton order every this many ticks (0: never)')
+    parser.add_argument('--container', help='a lib.world.CONTAINERS name or a PGM/PPM path (default: circle)')
+    parser.add_argument('--load', metavar='PATH',
+                        help='start from a snapshot (its substeps, iterations and ball count are used)')
+    parser.add_argument('--save', metavar='PATH', help='save a snapshot at the end ({substeps} is replaced)')
+    parser.add_argument('--governor', metavar='MS', type=float, nargs='?', const=MSPF * PHYSICS_BUDGET,
+                        help='adjust quality to keep each tick within MS (default: %(const)s)')
+    args = parser.parse_args()
+    budget = args.governor and args.governor / 1000
+
+    balls = dict(SCALED) if args.scaled else dict(ball_n=BALL_N, ball_r=BALL_R, ball_cooltime=BALL_COOLTIME)
+    for name, value in (('ball_n', args.balls), ('ball_r', args.radius), ('ball_cooltime', args.cooltime)):
+        if value is not None:
+            balls[name] = value
+
+    if args.load:
+        print(f'snapshot {args.load}')
+        # 공 반지름은 스냅샷에 맞춤
+        with open(args.load, 'rb') as f:
+            ball_r = snapshot.read_header(f.read(snapshot.HEADER.size))['ball_r']
+        run(args.ticks, args.report, args.load, args.save, budget, workers=args.workers,
+            sleep=args.sleep, container=args.container, reorder=args.reorder, **dict(balls, ball_r=ball_r))
+
+    # 여러 값을 주면 하나씩 돌려서 비교
+    for substeps in [] if args.load else args.substeps:
+        print(f'substeps {substeps or "auto"}')
+        save = args.save and args.save.format(substeps=substeps)
+        run(args.ticks, args.report, args.load, save, budget, substeps=substeps or None,
+            iterations=args.iterations, workers=args.workers, sleep=args.sleep,
+            container=args.container, reorder=args.reorder, **balls)
@@ -0,0 +1,188 @@
+import numpy as np
+
+# close_pairs에서 이 배수 거리 안의 쌍만 남김 (처리 도중 밀려서 겹치는 쌍까지 포함)
+MARGIN = 1.25
+
+HASH = 1 << 20  # solve의 우선순위 해시 범위
+
+
+def close_pairs(pos, a, b, r):
+    d = pos[a] - pos[b]
+    close = (d * d).sum(axis=1) < (r * 2 * MARGIN) ** 2
+    return a[close], b[close]
+
+def solve(pos, a, b, r, w=None, ordered=False):
+    """
+    쌍 (a[k], b[k])의 겹친 공을 떼어 놓음
+    w: 공마다 움직이는 비율의 가중치 (0이면 고정, None이면 모두 1 -> 반씩)
+    ordered: 해시 대신 (작은 번호, 큰 번호) 순서로 (예전 이중 루프와 같은 결과, 비교용. bench_solve.py)
+
+    한 배치 안에서는 공이 한 번씩만 나오도록 쌍을 나눠서 배치마다 한꺼번에 처리
+    (배치를 차례로 적용하므로 쌍을 어떤 순서로 하나씩 처리한 것과 같음)
+    쌍마다 (a, b)의 해시로 정한 우선순위가 양쪽 공에서 모두 가장 작으면 이번 배치에 들어감.
+    k 순서를 그대로 쓰면 쌍이 사슬처럼 이어질 때 배치 수가 사슬 길이만큼 늘어나므로
+    해시로 섞어서 배치 수를 이웃 수 정도로 유지. 입력이 같으면 결과도 같음
+    """
+    r2 = r * 2
+    n = len(a)
+    if ordered:
+        prio = np.empty(n, np.int64)
+        prio[np.lexsort((np.maximum(a, b), np.minimum(a, b)))] = np.arange(n)
+    else:
+        # 해시가 같으면 k로 구분 (같은 공을 가진 쌍끼리는 우선순위가 달라야 함)
+        prio = ((a * 73856093) ^ (b * 19349663)) % HASH * n + np.arange(n)
+
+    while len(a):
+        first = np.full(len(pos), HASH * n)
+        np.minimum.at(first, a, prio)
+        np.minimum.at(first, b, prio)
+        batch = (first[a] == prio) & (first[b] == prio)
+
+        i, j = a[batch], b[batch]
+        d = pos[i] - pos[j]
+        dist = np.hypot(d[:, 0], d[:, 1])
+        hit = (dist < r2) & (dist > 0)
+        i, j, d, dist = i[hit], j[hit], d[hit], dist[hit]
+
+        if w is None:
+            dd = d * ((r - dist / 2) / dist)[:, None]
+            pos[i] += dd
+            pos[j] -= dd
+        else:
+            dd = d * ((r2 - dist) / dist / (w[i] + w[j]))[:, None]
+            pos[i] += dd * w[i][:, None]
+            pos[j] -= dd * w[j][:, None]
+
+        keep = ~batch
+        a, b, prio = a[keep], b[keep], prio[keep]
+
+
+class Bodies:
+    """
+    공들의 상태를 (N, 2) 배열로 보관 (Verlet: 현재 위치 pos, 이전 위치 pos_b)
+
+    행 i가 공 하나, 앞쪽 n행만 유효. 배열은 용량이 부족할 때 두 배로 늘림
+
+    잠든 공(awake가 False)은 움직이지 않음: 적분과 용기 검사에서 빠지고,
+    충돌에서는 고정된 벽처럼 깨어 있는 공만 밀려남. 잠든 공끼리의 쌍은 건너뜀
+    dirty: 마지막으로 지운 뒤 움직인 공 (렌더러가 그릴 공만 고를 때)
+    """
+
+    FIELDS = ('pos', 'pos_b', 'ids', 'awake', 'still', 'dirty')
+
+    def __init__(self, r, capacity=256):
+        self.r = r
+        self.n = 0
+        self.pos = np.zeros((capacity, 2))
+        self.pos_b = np.zeros((capacity, 2))
+        self.ids = np.zeros(capacity, np.int64)
+        self.awake = np.zeros(capacity, bool)
+        self.still = np.zeros(capacity, np.int32)  # 연속으로 거의 안 움직인 틱 수
+        self.dirty = np.zeros(capacity, bool)
+
+    def __len__(self):
+        return self.n
+
+    def grow(self):
+        for field in self.FIELDS:
+            a = getattr(self, field)
+            b = np.zeros((len(a) * 2,) + a.shape[1:], a.dtype)
+            b[:len(a)] = a
+            setattr(self, field, b)
+
+    def add(self, pos, pos_b=None, id=0):
+        if self.n == len(self.pos):
+            self.grow()
+
+        i = self.n
+        self.pos[i] = pos
+        self.pos_b[i] = pos if pos_b is None else pos_b
+        self.ids[i] = id
+        self.awake[i] = True
+        self.still[i] = 0
+        self.dirty[i] = True
+        self.n += 1
+        return i
+
+    def permute(self, order):
+        # 행 순서를 order로 (새 i번째 = 이전 order[i]번째). ids 등 모든 필드가 함께 옮겨감
+        n = self.n
+        for field in self.FIELDS:
+            a = getattr(self, field)
+            a[:n] = a[:n][order]
+
+    def active(self):
+        # 깨어 있는 공의 번호
+        return np.flatnonzero(self.awake[:self.n])
+
+    def integrate(self, g, idx=slice(None)):
+        # pos, pos_b = 2*pos - pos_b + g, pos
+        pos = self.pos[:self.n]
+        pos_b = self.pos_b[:self.n]
+        p = pos[idx]
+        v = p - pos_b[idx]
+        pos_b[idx] = p
+        pos[idx] = p + v + g
+        self.dirty[:self.n][idx] = True
+
+    def rescale(self, k):
+        # 속도(pos - pos_b)를 k배로
+        pos = self.pos[:self.n]
+        self.pos_b[:self.n] = pos - (pos - self.pos_b[:self.n]) * k
+
+    def constrain(self, center, r, idx=slice(None)):
+        # 중심에서 r보다 멀리 나간 공을 원 위로
+        pos = self.pos[:self.n]
+        d = pos[idx] - center
+        dist = np.hypot(d[:, 0], d[:, 1])
+        out = dist > r
+        if isinstance(idx, slice):
+            idx = np.arange(self.n)[idx]
+        pos[idx[out]] = center + d[out] * (r / dist[out])[:, None]
+
+    def weights(self):
+        # solve의 w: 깨어 있으면 1, 잠들었으면 0 (모두 깨어 있으면 None)
+        awake = self.awake[:self.n]
+        return None if awake.all() else awake.astype(float)
+
+    def solve(self, a, b):
+        # 후보 쌍 (a[k], b[k]) 중 겹친 쌍을 떼어 놓음
+        awake = self.awake
+        keep = awake[a] | awake[b]
+        a, b = close_pairs(self.pos, a[keep], b[keep], self.r)
+        solve(self.pos, a, b, self.r, self.weights())
+
+    def sleep(self, speed, ticks):
+        # 단계당 이동 거리가 speed 미만인 틱이 ticks번 이어지면 재움 (틱마다 호출)
+        idx = self.active()
+        d = self.pos[idx] - self.pos_b[idx]
+        still = np.where(np.hypot(d[:, 0], d[:, 1]) < speed, self.still[idx] + 1, 0)
+        self.still[idx] = still
+
+        fall = idx[still >= ticks]
+        self.awake[fall] = False
+        self.pos_b[fall] = self.pos[fall]
+        return fall
+
+    def wake(self, a, b, speed):
+        # 단계당 speed 이상으로 움직이는 깨어 있는 공과 닿은 잠든 공을 깨움
+        awake = self.awake
+        one = awake[a] != awake[b]
+        a, b = a[one], b[one]
+        mover = np.where(awake[a], a, b)
+        sleeper = np.where(awake[a], b, a)
+
+        d = self.pos[mover] - self.pos[sleeper]
+        v = self.pos[mover] - self.pos_b[mover]
+        touch = (d * d).sum(axis=1) <= (self.r * 2 * MARGIN) ** 2
+        fast = (v * v).sum(axis=1) >= speed * speed
+
+        woken = sleeper[touch & fast]
+        awake[woken] = True
+        self.still[woken] = 0
+        self.pos_b[woken] = self.pos[woken]
+        return woken
+
+    @property
+    def awake_count(self):
+        return int(self.awake[:self.n].sum())
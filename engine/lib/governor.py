@@ -0,0 +1,165 @@
+from collections import namedtuple
+from time import perf_counter
+
+"""
+Quality governor
+
+물리(틱 하나)와 렌더링(프레임 하나)에 걸린 시간을 따로 재서 예산과 비교
+  물리가 넘치면 physics_levels()에서 한 단계 아래로 (충돌 반복 수, 단계 수, 공 생성 간격)
+  렌더링이 넘치면 RENDER_LEVELS에서 한 단계 아래로 (프레임 몇 개마다 그릴지)
+두 쪽 다 여유(예산의 HEADROOM 미만)가 RESTORE_FRAMES 프레임 이어지면 한 단계씩 되돌림
+되돌리자마자 다시 넘치면 그 단계로 되돌리기 전 기다리는 시간을 두 배로 (왔다 갔다 하지 않도록)
+
+substeps가 자동이면 World가 단계 수를 늘려서 물리 시간을 목표까지 채우므로 그 목표(auto_budget)를
+예산의 AUTO_SHARE로 둠. 예산과 같으면 평균이 늘 예산 근처라서 공 생성까지 멈추고 되돌리지 못함
+
+결정마다 timeline에 기록 (시각, 틱, 어느 쪽, 잰 시간, 예산, 이전 단계, 다음 단계)
+"""
+
+RENDER_LEVELS = (1, 2, 3, 4)  # 이 프레임마다 한 번 그림
+
+SMOOTHING = 0.1  # 잰 시간의 지수 이동 평균 비율
+COOLDOWN = 30  # 단계를 바꾼 뒤 이 프레임 동안은 다시 낮추지 않음 (새 단계의 시간이 평균에 반영되도록)
+HEADROOM = 0.6
+AUTO_SHARE = 0.4  # HEADROOM보다 충분히 작게
+RESTORE_FRAMES = 120
+
+Event = namedtuple('Event', ['time', 'ticks', 'channel', 'cost', 'budget', 'old', 'new'])
+
+
+def physics_levels(base):
+    """
+    설정한 값(base: substeps, iterations, ball_cooltime)에서 한 단계씩 낮춘 목록 (0이 base 그대로)
+
+    충돌 반복 수를 반씩 1까지, 단계 수를 반씩 1까지 (substeps가 None이면 World가 자동으로
+    정하므로 건드리지 않음), 공 생성 간격을 두 배로, 마지막은 공 생성 중지(ball_cooltime 0)
+    """
+    level = dict(base)
+    levels = [dict(level)]
+    while level['iterations'] > 1:
+        level['iterations'] //= 2
+        levels.append(dict(level))
+    while level['substeps'] and level['substeps'] > 1:
+        level['substeps'] //= 2
+        levels.append(dict(level))
+    if level['ball_cooltime']:
+        level['ball_cooltime'] *= 2
+        levels.append(dict(level))
+        level['ball_cooltime'] = 0
+        levels.append(dict(level))
+    return tuple(levels)
+
+
+class Channel:
+    """한 쪽(물리 또는 렌더링)의 평균 시간과 단계"""
+
+    def __init__(self, name, levels, budget):
+        self.name = name
+        self.levels = levels
+        self.budget = budget
+        self.level = 0
+        self.cost = 0.
+        self.wait = [RESTORE_FRAMES] * len(levels)  # 단계마다 되돌리기 전 기다릴 프레임 수
+
+    @property
+    def setting(self):
+        return self.levels[self.level]
+
+    def measure(self, t):
+        self.cost += (t - self.cost) * SMOOTHING
+
+
+class Governor:
+    """
+    물리 예산(틱 하나, 초)과 렌더링 예산(프레임 하나, 초) 안에 들도록 품질을 조절
+
+    base: World에 설정한 substeps(None이면 자동), iterations, ball_cooltime. 예산을 넘기 전까지는 그대로 둠
+    frame()과 draw()는 화면 프레임마다, physics(t)는 틱마다, render(t)는 draw()가 참일 때 그린 시간으로
+    단계가 바뀌면 on_physics(setting), on_render(decimation) 콜백을 부름
+    World에는 set(auto_budget=governor.auto_budget)로 자동 단계 수의 목표를 알려 줌
+    """
+
+    def __init__(self, physics_budget, render_budget, base, on_physics=None, on_render=None):
+        self.physics_channel = Channel('physics', physics_levels(base), physics_budget)
+        self.render_channel = Channel('render', RENDER_LEVELS, render_budget)
+        self.on_physics = on_physics
+        self.on_render = on_render
+
+        self.timeline = []
+        self.start = perf_counter()
+        self.frames = 0
+        self.changed = -COOLDOWN  # 마지막으로 단계를 바꾼 프레임
+        self.raised = {}  # 채널 이름 -> 마지막으로 단계를 올린 프레임
+        self.ticks = 0
+
+    @property
+    def auto_budget(self):
+        return self.physics_channel.budget * AUTO_SHARE
+
+    @property
+    def decimation(self):
+        return self.render_channel.setting
+
+    def physics(self, t):
+        self.physics_channel.measure(t)
+
+    def render(self, t):
+        self.render_channel.measure(t)
+
+    def draw(self):
+        # 이번 프레임을 그릴지 (렌더링 단계에 따라 건너뜀, 건너뛴 프레임의 렌더링 시간은 0으로)
+        if self.frames % self.decimation:
+            self.render_channel.measure(0.)
+            return False
+        return True
+
+    def rebase(self, base):
+        # 사용자가 물리 설정을 직접 바꿨을 때: 그 값을 새 최고 단계로
+        channel = self.physics_channel
+        channel.levels = physics_levels(base)
+        channel.level = 0
+        channel.wait = [RESTORE_FRAMES] * len(channel.levels)
+        self.changed = self.frames
+
+    def set_level(self, channel, level):
+        old = channel.setting
+        channel.level = level
+        self.changed = self.frames
+        self.timeline.append(Event(perf_counter() - self.start, self.ticks, channel.name,
+                                   channel.cost, channel.budget, old, channel.setting))
+        callback = self.on_physics if channel is self.physics_channel else self.on_render
+        if callback:
+            callback(channel.setting)
+
+    def frame(self, ticks=None):
+        # 화면 프레임마다: 예산을 넘은 쪽을 낮추거나, 둘 다 여유가 있으면 되돌림
+        self.frames += 1
+        if ticks is not None:
+            self.ticks = ticks
+        if self.frames - self.changed < COOLDOWN:
+            return
+
+        channels = (self.physics_channel, self.render_channel)
+        for channel in channels:
+            if channel.cost > channel.budget and channel.level < len(channel.levels) - 1:
+                # 막 올린 단계가 넘치면 그 단계는 더 오래 기다린 뒤에 다시 올림
+                if self.frames - self.raised.get(channel.name, -1e9) < 2 * RESTORE_FRAMES:
+                    channel.wait[channel.level] *= 2
+                self.set_level(channel, channel.level + 1)
+                return
+
+        for channel in channels:
+            if (channel.level > 0 and all(c.cost < c.budget * HEADROOM for c in channels)
+                    and self.frames - self.changed >= channel.wait[channel.level - 1]):
+                self.raised[channel.name] = self.frames
+                self.set_level(channel, channel.level - 1)
+                return
+
+    def format_timeline(self):
+        return '\n'.join(
+            f'{e.time:8.2f}s  tick {e.ticks:7}  {e.channel:7}  {e.cost * 1000:7.2f}ms / '
+            f'{e.budget * 1000:6.2f}ms  {e.old} -> {e.new}' for e in self.timeline)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write(self.format_timeline() + '\n')
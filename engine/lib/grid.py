@@ -0,0 +1,96 @@
+import numpy as np
+
+
+# 칸 좌표를 하나의 정수 키로: (kx + OFFSET) * STRIDE + (ky + OFFSET)
+STRIDE = 1 << 20
+OFFSET = 1 << 19
+
+# pairs()에서 중복 없이 이웃 칸을 한 번씩만 보기 위한 절반의 이웃
+HALF_NEIGHBORS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def spread(v):
+    # 16비트 정수의 비트 사이사이에 0을 끼움 (Morton 키용)
+    v = v.astype(np.uint32) & 0xffff
+    v = (v | v << 8) & 0x00ff00ff
+    v = (v | v << 4) & 0x0f0f0f0f
+    v = (v | v << 2) & 0x33333333
+    v = (v | v << 1) & 0x55555555
+    return v
+
+def expand(lo, hi):
+    # 각 i에 대해 [lo[i], hi[i]) 범위를 펼쳐 (i, j) 쌍으로
+    count = hi - lo
+    a = np.repeat(np.arange(len(lo)), count)
+    start = np.repeat(lo - np.cumsum(count) + count, count)
+    b = start + np.arange(len(a))
+    return a, b
+
+
+class Grid:
+    """
+    균일 공간 해시 격자
+
+    cell 크기를 충돌 거리 이상으로 잡으면 충돌 후보는 자기 칸과 주변 8칸에만 있음
+    키를 정렬해 두고 이분 탐색하므로 질의 비용은 전체 개수와 무관함
+    좌표를 감싸지 않음: 칸은 floor(pos / cell)이고 화면 가장자리 칸끼리 이웃이 아님
+    공은 원형 용기 안에 있으므로 칸 좌표는 OFFSET 범위 안 (floor라서 음수 좌표도 아래쪽 칸으로)
+    """
+
+    def __init__(self, cell):
+        self.cell = cell
+        self.order = np.empty(0, np.intp)
+        self.keys = np.empty(0, np.int64)
+
+    def key(self, pos):
+        k = np.floor(np.asarray(pos) / self.cell).astype(np.int64) + OFFSET
+        return k[..., 0] * STRIDE + k[..., 1]
+
+    def morton(self, pos):
+        # 칸 좌표의 Z-order 키 (가까운 칸끼리 키도 가까움). 칸 좌표는 하위 16비트만
+        k = np.floor(np.asarray(pos) / self.cell).astype(np.int64) + (1 << 15)
+        return spread(k[..., 0]) | spread(k[..., 1]) << 1
+
+    def rebuild(self, pos):
+        keys = self.key(pos)
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def near(self, pos):
+        k = self.key(pos)
+        # 같은 x 열의 세 칸은 키가 연속이므로 열마다 범위 하나
+        ranges = [np.searchsorted(self.keys, (k + dx*STRIDE - 1, k + dx*STRIDE + 2))
+                  for dx in (-1, 0, 1)]
+        return np.concatenate([self.order[lo:hi] for lo, hi in ranges])
+
+    def pairs_with(self, pos):
+        # pos의 각 점과 주변 9칸에 있는 격자 점의 쌍 (i: pos의 번호, j: rebuild에 넣은 점의 번호)
+        k = self.key(pos)
+        res_i = []
+        res_j = []
+        for dx in (-1, 0, 1):
+            i, j = expand(np.searchsorted(self.keys, k + dx*STRIDE - 1),
+                          np.searchsorted(self.keys, k + dx*STRIDE + 2))
+            res_i.append(i)
+            res_j.append(self.order[j])
+        return np.concatenate(res_i), np.concatenate(res_j)
+
+    def pairs(self):
+        keys = self.keys
+        n = len(keys)
+
+        # 같은 칸: 정렬된 순서에서 자기 뒤쪽만
+        lo = np.arange(1, n + 1)
+        hi = np.searchsorted(keys, keys, 'right')
+        a, b = expand(lo, hi)
+
+        res_a = [a]
+        res_b = [b]
+        for dx, dy in HALF_NEIGHBORS:
+            target = keys + dx*STRIDE + dy
+            a, b = expand(np.searchsorted(keys, target, 'left'),
+                          np.searchsorted(keys, target, 'right'))
+            res_a.append(a)
+            res_b.append(b)
+
+        return self.order[np.concatenate(res_a)], self.order[np.concatenate(res_b)]
@@ -0,0 +1,100 @@
+from time import perf_counter
+
+
+class Stats:
+    """최근 프레임들의 시간 사용량 (지수 이동 평균, ms)"""
+
+    SMOOTH = 0.1
+
+    def __init__(self):
+        self.frame = 0.
+        self.sim = 0.
+        self.render = 0.
+        self.ticks = 0.
+        self.dropped = 0  # 따라잡기를 포기한 틱 수 (누적)
+
+    def update(self, frame, sim, render, ticks):
+        a = self.SMOOTH
+        self.frame += (frame * 1000 - self.frame) * a
+        self.sim += (sim * 1000 - self.sim) * a
+        self.render += (render * 1000 - self.render) * a
+        self.ticks += (ticks - self.ticks) * a
+
+    def text(self, budget):
+        return (f'frame {self.frame:5.2f}ms / {budget:.0f}ms\n'
+                f'sim {self.sim:5.2f}ms  render {self.render:5.2f}ms\n'
+                f'ticks/frame {self.ticks:4.2f}  dropped {self.dropped}')
+
+
+class Loop:
+    """
+    고정 시간 간격 게임 루프
+
+    실제 경과 시간(perf_counter)만큼 tick을 실행해 시뮬레이션 시간을 맞추고
+    (한 프레임에 최대 max_ticks), 남은 시간 비율 alpha로 render를 호출해 보간
+    tick이 False를 반환하면 루프 정지
+    frame_time: 렌더링 간격 (기본은 dt와 같음). 틱과 따로 이 간격마다만 render를 호출
+    """
+
+    # 예정보다 이만큼(frame_time 비율) 일찍 깨어나도 렌더링 (after()의 ms 반올림 오차)
+    SLACK = 0.25
+
+    def __init__(self, root, tick, render, dt, max_ticks=5, frame_time=None):
+        self.root = root
+        self.tick = tick
+        self.render = render
+        self.dt = dt
+        self.max_ticks = max_ticks
+        self.frame_time = frame_time or dt
+
+        self.stats = Stats()
+        self.after_id = None
+
+    def start(self):
+        self.stop()
+        self.acc = 0.
+        self.last = perf_counter()
+        self.next_render = self.last
+        self.after_id = self.root.after(0, self.frame)
+
+    def stop(self):
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def frame(self):
+        start = perf_counter()
+        self.acc += start - self.last
+        self.last = start
+
+        running = True
+        ticks = 0
+        while self.acc >= self.dt:
+            if ticks == self.max_ticks:
+                # 너무 밀렸으면 나머지는 버림 (게임이 느려지되 멈추지는 않음)
+                self.stats.dropped += int(self.acc / self.dt)
+                self.acc %= self.dt
+                break
+
+            self.acc -= self.dt
+            ticks += 1
+            if not self.tick():
+                running = False
+                break
+
+        sim = perf_counter()
+        if not running or sim >= self.next_render - self.frame_time * self.SLACK:
+            self.render(self.acc / self.dt)
+            # 밀렸으면 지금부터 다시 셈
+            self.next_render = max(self.next_render + self.frame_time, sim)
+        end = perf_counter()
+
+        self.stats.update(end - start, sim - start, end - sim, ticks)
+
+        if running:
+            # 다음 tick 시각과 다음 렌더링 시각 중 빠른 쪽에 깨어남
+            wait = min(start + self.dt - self.acc, self.next_render) - end
+            ms = max(1, round(wait * 1000))
+            self.after_id = self.root.after(ms, self.frame)
+        else:
+            self.after_id = None
@@ -0,0 +1,132 @@
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from lib.bodies import close_pairs, solve
+
+"""
+Parallel solver
+
+공간을 TILE x TILE 칸 크기의 타일로 나누고 체크무늬 4색으로 칠함
+  색 = (tx % 2) + 2 * (ty % 2)
+쌍은 첫 번째 공(a)이 있는 타일이 맡음. 쌍의 다른 공은 이웃 칸에 있으므로
+타일 하나가 건드리는 공은 그 타일과 바깥 한 칸 테두리 안에만 있고,
+TILE >= 2 이면 같은 색 타일들의 테두리는 겹치지 않음 -> 같은 색은 동시에 처리해도 됨
+
+색 0 -> 1 -> 2 -> 3 순서로, 각 색의 쌍을 (타일, a, b) 순으로 정렬해 워커들에게 타일 경계에서 나눠 줌
+타일끼리는 독립이므로 워커 수나 실행 순서와 상관없이 결과가 같음 (결정적)
+
+위치, 쌍, 가중치(잠든 공은 0) 배열은 multiprocessing.shared_memory에 두고 워커는 이름으로 붙음
+"""
+
+TILE = 2  # 타일 한 변의 격자 칸 수 (2 이상)
+COLORS = 4
+
+
+_attached = {}  # 역할 -> 워커가 열어 둔 SharedMemory
+
+def attach(role, name, shape, dtype):
+    # 워커에서 공유 메모리를 이름으로 한 번만 열어 둠
+    # 부모가 용량을 늘려 새로 만들면 이름이 바뀌므로 이전 것은 닫음 (지워진 메모리를 붙잡지 않도록)
+    shm = _attached.get(role)
+    if shm is None or shm.name != name:
+        if shm is not None:
+            shm.close()
+        shm = _attached[role] = shared_memory.SharedMemory(name)
+    return np.ndarray(shape, dtype, buffer=shm.buf)
+
+def solve_slice(task):
+    pos_name, w_name, capacity, pairs_name, pair_capacity, start, end, r = task
+    pos = attach('pos', pos_name, (capacity, 2), np.float64)
+    w = attach('w', w_name, (capacity,), np.float64) if w_name else None
+    pairs = attach('pairs', pairs_name, (2, pair_capacity), np.int64)
+    solve(pos, pairs[0, start:end], pairs[1, start:end], r, w)
+
+
+class ParallelSolver:
+    """
+    Bodies.solve와 같은 일을 workers개 프로세스로 (workers=1이어도 프로세스 하나를 씀)
+
+    close()로 워커와 공유 메모리를 정리해야 함
+    """
+
+    def __init__(self, r, cell, workers=None, capacity=1024):
+        self.r = r
+        self.tile = cell * TILE
+
+        # 공유 메모리를 먼저 만들어야 워커들이 부모의 resource tracker를 같이 씀
+        # (워커마다 따로 생기면 워커가 끝날 때 그 tracker가 공유 메모리를 지워 버림)
+        self.pos_shm = self.w_shm = self.pairs_shm = None
+        self.alloc(capacity, capacity * 8)
+
+        self.pool = Pool(workers)
+        self.workers = self.pool._processes
+
+    def alloc(self, capacity, pair_capacity):
+        # 용량이 바뀌면 새 공유 메모리를 만듦 (워커는 새 이름으로 다시 붙음)
+        for shm in (self.pos_shm, self.w_shm, self.pairs_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        self.capacity = capacity
+        self.pair_capacity = pair_capacity
+        self.pos_shm = shared_memory.SharedMemory(create=True, size=capacity * 2 * 8)
+        self.w_shm = shared_memory.SharedMemory(create=True, size=capacity * 8)
+        self.pairs_shm = shared_memory.SharedMemory(create=True, size=2 * pair_capacity * 8)
+        self.pos = np.ndarray((capacity, 2), np.float64, buffer=self.pos_shm.buf)
+        self.w = np.ndarray((capacity,), np.float64, buffer=self.w_shm.buf)
+        self.pairs = np.ndarray((2, pair_capacity), np.int64, buffer=self.pairs_shm.buf)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for shm in (self.pos_shm, self.w_shm, self.pairs_shm):
+            shm.close()
+            shm.unlink()
+        self.pos_shm = self.w_shm = self.pairs_shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tasks(self, start, end, tiles, weighted=False):
+        # [start, end) 구간을 워커 수만큼, 타일 경계에서 쌍 수가 비슷하게 나눔
+        bounds = start + np.flatnonzero(np.diff(tiles[start:end])) + 1
+        cuts = np.linspace(start, end, self.workers + 1)[1:-1]
+        cuts = bounds[np.searchsorted(bounds, cuts).clip(max=len(bounds) - 1)] if len(bounds) else []
+        edges = np.unique(np.concatenate(([start], cuts, [end]))).astype(int)
+        w_name = self.w_shm.name if weighted else None
+        return [(self.pos_shm.name, w_name, self.capacity, self.pairs_shm.name, self.pair_capacity,
+                 s, e, self.r) for s, e in zip(edges[:-1], edges[1:]) if e > s]
+
+    def solve(self, bodies, a, b):
+        n = bodies.n
+        keep = bodies.awake[a] | bodies.awake[b]
+        a, b = close_pairs(bodies.pos, a[keep], b[keep], self.r)
+        if n > self.capacity or len(a) > self.pair_capacity:
+            self.alloc(max(n, self.capacity * 2), max(len(a), self.pair_capacity * 2))
+
+        # 쌍을 (색, 타일, a, b) 순으로
+        t = np.floor(bodies.pos[a] / self.tile).astype(np.int64)
+        color = (t[:, 0] & 1) + 2 * (t[:, 1] & 1)
+        tiles = (t[:, 0] << 32) + t[:, 1]
+        order = np.lexsort((b, a, tiles, color))
+        a, b, color, tiles = a[order], b[order], color[order], tiles[order]
+
+        self.pos[:n] = bodies.pos[:n]
+        w = bodies.weights()
+        if w is not None:
+            self.w[:n] = w
+        self.pairs[0, :len(a)] = a
+        self.pairs[1, :len(b)] = b
+
+        edges = np.searchsorted(color, np.arange(COLORS + 1))
+        for c in range(COLORS):
+            tasks = self.tasks(edges[c], edges[c + 1], tiles, w is not None)
+            if tasks:
+                self.pool.map(solve_slice, tasks, chunksize=1)
+
+        bodies.pos[:n] = self.pos[:n]
@@ -0,0 +1,210 @@
+import multiprocessing as mp
+from collections import namedtuple
+from multiprocessing import shared_memory
+from time import perf_counter
+
+import numpy as np
+
+from lib import snapshot
+from lib import world as config
+
+"""
+Frame buffer structure (multiprocessing.shared_memory 하나)
+
+int64 latest                      마지막으로 다 쓴 버퍼 번호 (0, 1)
+int64 meta[2][META]               버퍼마다 seq, n, ticks, awake, substeps, step_cost(ns)
+f64   pos[2][capacity][2]         버퍼마다 공 위치 (공이 생긴 순서대로)
+
+시뮬레이션 프로세스는 latest가 아닌 쪽 버퍼에 쓰고 다 쓰면 latest를 바꿈
+쓰는 동안은 그 버퍼의 seq를 -1로 두고, 다 쓰면 프레임 번호(1부터)로
+읽는 쪽은 latest 버퍼를 복사한 뒤 seq가 그대로인지 확인 (그 사이 두 프레임이 지나가서
+같은 버퍼를 덮어쓰기 시작했으면 버리고 torn으로 셈)
+
+제어는 Pipe로: ('pause',), ('resume',), ('set', {이름: 값}) (World.set), ('save', 경로), ('stop',)
+"""
+
+META = 6
+SEQ, N, TICKS, AWAKE, SUBSTEPS, COST = range(META)
+
+MAX_TICKS = 5  # 한 번에 따라잡을 최대 틱 수 (더 밀리면 버림)
+
+Frame = namedtuple('Frame', ['seq', 'ticks', 'pos', 'awake', 'substeps', 'step_cost'])
+
+
+def size(capacity):
+    return 8 + 2 * META * 8 + 2 * capacity * 2 * 8
+
+def views(buf, capacity):
+    latest = np.ndarray((1,), np.int64, buffer=buf)
+    meta = np.ndarray((2, META), np.int64, buffer=buf, offset=8)
+    pos = np.ndarray((2, capacity, 2), np.float64, buffer=buf, offset=8 + 2 * META * 8)
+    return latest, meta, pos
+
+def publish(world, latest, meta, pos, seq):
+    # latest가 아닌 쪽 버퍼에 쓰고 바꿈
+    i = 1 - latest[0]
+    n = len(world)
+    m = meta[i]
+    m[SEQ] = -1
+    # 배열이 다시 정렬되어도 그리는 쪽의 번호가 그대로이도록 생긴 순서(ids)대로
+    pos[i, world.bodies.ids[:n]] = world.bodies.pos[:n]
+    m[N] = n
+    m[TICKS] = world.ticks
+    m[AWAKE] = world.awake
+    m[SUBSTEPS] = world.substeps
+    m[COST] = int(world.step_cost * 1e9)
+    m[SEQ] = seq
+    latest[0] = i
+    return seq
+
+def number(world, i):
+    # 시뮬레이션 프로세스에는 캔버스가 없으므로 ids에 생긴 순서를 둠
+    world.bodies.ids[i] = i
+
+def simulate(shm_name, capacity, conn, params, load, dt):
+    # 시뮬레이션 프로세스: dt마다 한 틱, 틱마다 프레임 하나를 씀
+    from lib.world import World
+
+    shm = shared_memory.SharedMemory(shm_name)
+    latest, meta, pos = views(shm.buf, capacity)
+    world = World(**params)
+    world.on_spawn.append(number)
+    if load:
+        world.restore(load)
+    world.ball_n = min(world.ball_n, capacity)
+
+    seq = publish(world, latest, meta, pos, 1)
+    paused = False
+    due = perf_counter()
+    try:
+        while True:
+            wait = None if paused else max(0., due - perf_counter())
+            if conn.poll(wait):
+                cmd, *args = conn.recv()
+                if cmd == 'stop':
+                    break
+                elif cmd == 'pause':
+                    paused = True
+                elif cmd == 'resume':
+                    paused = False
+                    due = perf_counter()
+                elif cmd == 'set':
+                    world.set(**args[0])
+                    world.ball_n = min(world.ball_n, capacity)
+                elif cmd == 'save':
+                    world.save(*args)
+                continue
+
+            now = perf_counter()
+            ticks = world.ticks
+            for _ in range(MAX_TICKS):
+                if due > now:
+                    break
+                world.step()
+                due += dt
+            due = max(due, now - dt)  # 너무 밀리면 따라잡지 않고 버림
+            if world.ticks != ticks:
+                seq = publish(world, latest, meta, pos, seq + 1)
+    finally:
+        world.close()
+        del latest, meta, pos
+        shm.close()
+
+
+class RemoteWorld:
+    """
+    World를 별도 프로세스에서 돌리고 최신 프레임만 읽어 옴 (lib.world.World의 매개변수를 그대로)
+
+    렌더러는 latest()로 새 프레임이 있을 때만 그림 (프로세스가 죽었으면 RuntimeError)
+    공 수는 capacity(와 불러온 스냅샷의 공 수)까지
+    frames: 읽은 프레임 수, dropped: 읽기 전에 덮어쓴 프레임 수, torn: 복사 도중 바뀌어서 버린 수
+    spawn으로 프로세스를 만들므로 Tk와 상관없이 만들 수 있음. 다 쓰면 close()
+    """
+
+    def __init__(self, capacity, dt, load=None, **params):
+        # World.settings()와 같은 값을 이쪽에서도 (set으로 바꾼 값까지)
+        self.quality = dict(substeps=params.get('substeps', config.SUBSTEPS),
+                            iterations=params.get('iterations', config.ITERATIONS),
+                            ball_cooltime=params.get('ball_cooltime', config.BALL_COOLTIME))
+        if load:
+            with open(load, 'rb') as f:
+                header = snapshot.read_header(f.read(snapshot.HEADER.size))
+            # 스냅샷의 공이 다 들어가도록
+            capacity = max(capacity, header['n'])
+            self.quality.update(substeps=None if header['auto'] else header['substeps'],
+                                iterations=header['iterations'])
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(create=True, size=size(capacity))
+        self.latest_i, self.meta, self.pos = views(self.shm.buf, capacity)
+        self.meta[:, SEQ] = 0
+        self.latest_i[0] = 0
+
+        ctx = mp.get_context('spawn')
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=simulate,
+                                   args=(self.shm.name, capacity, child, params, load, dt))
+        self.process.start()
+        child.close()
+
+        self.paused = False
+        self.seq = 0
+        self.frames = self.dropped = self.torn = 0
+
+    def send(self, *cmd):
+        self.conn.send(cmd)
+
+    def pause(self):
+        self.paused = True
+        self.send('pause')
+
+    def resume(self):
+        self.paused = False
+        self.send('resume')
+
+    def settings(self):
+        return dict(self.quality)
+
+    def set(self, **params):
+        self.quality.update((k, v) for k, v in params.items() if k in self.quality)
+        self.send('set', params)
+
+    def save(self, path):
+        self.send('save', str(path))
+
+    def latest(self):
+        # 새로 다 쓴 프레임 (없으면 None)
+        i = int(self.latest_i[0])
+        m = self.meta[i]
+        seq = int(m[SEQ])
+        if seq <= self.seq:
+            # 시뮬레이션 프로세스가 죽었으면 (스냅샷 오류, World의 예외 등) 더 기다리지 않음
+            if not self.process.is_alive():
+                raise RuntimeError(f'simulation process exited with code {self.process.exitcode}')
+            return None
+
+        n = int(m[N])
+        frame = Frame(seq, int(m[TICKS]), self.pos[i, :n].copy(), int(m[AWAKE]),
+                      int(m[SUBSTEPS]), m[COST] / 1e9)
+        if int(m[SEQ]) != seq:
+            self.torn += 1
+            return None
+
+        self.frames += 1
+        self.dropped += seq - self.seq - 1
+        self.seq = seq
+        return frame
+
+    def close(self):
+        if self.process.is_alive():
+            self.send('stop')
+        self.process.join()
+        self.conn.close()
+        del self.latest_i, self.meta, self.pos
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,54 @@
+class Batch:
+    """
+    한 프레임 동안의 캔버스 변경을 모아 Tcl 스크립트 하나로 실행
+
+    canvas.move / coords / itemconfig를 항목마다 부르면 호출마다 Tcl 왕복이 생기므로
+    flush()에서 tk.eval 한 번으로 처리. calls는 마지막 프레임의 Tcl 호출 수
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.path = canvas._w
+        self.lines = []
+
+        self.calls = 0
+        self._calls = 0
+
+    def coords(self, id, *xy):
+        self.lines.append(f'{self.path} coords {id} ' + ' '.join(f'{v:.2f}' for v in xy))
+
+    def circle(self, id, pos, r):
+        x, y = pos
+        self.lines.append(f'{self.path} coords {id} {x - r:.2f} {y - r:.2f} {x + r:.2f} {y + r:.2f}')
+
+    def circles(self, ids, pos, r):
+        if hasattr(ids, 'tolist'):
+            ids = ids.tolist()
+        if hasattr(pos, 'tolist'):
+            pos = pos.tolist()
+
+        line = self.path + ' coords %d %.2f %.2f %.2f %.2f'
+        self.lines += [line % (id, x - r, y - r, x + r, y + r) for id, (x, y) in zip(ids, pos)]
+
+    def move(self, tag, dx, dy):
+        # 태그가 같은 항목들은 명령 하나로 함께 이동
+        self.lines.append(f'{self.path} move {tag} {dx:.2f} {dy:.2f}')
+
+    def itemconfig(self, id, **kw):
+        self.lines.append(f'{self.path} itemconfigure {id} ' +
+                          ' '.join(f'-{k} {{{v}}}' for k, v in kw.items()))
+
+    def call(self, *args):
+        # 바로 실행해야 하는 호출(반환값이 필요한 경우 등)도 개수에 포함
+        self._calls += 1
+        return self.canvas.tk.call(*args)
+
+    def flush(self):
+        if self.lines:
+            self.canvas.tk.eval('\n'.join(self.lines))
+            self.lines = []
+            self._calls += 1
+
+        self.calls = self._calls
+        self._calls = 0
+
@@ -0,0 +1,204 @@
+import hashlib
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+"""
+Signed distance field
+
+공이 다닐 수 있는 곳 = inside 도형 안이면서 어떤 obstacle 안도 아닌 곳
+도형마다 부호 있는 거리 d(p) (안쪽이 양수)를 구해서
+  phi(p) = min(d_inside(p), -d_obstacle_1(p), -d_obstacle_2(p), ...)
+phi는 가장 가까운 벽까지의 거리 (벽 안쪽이면 음수), 기울기는 벽에서 멀어지는 방향
+
+phi와 기울기를 CELL 간격 격자에 미리 계산해 두고 공마다 쌍선형 보간으로 읽음
+-> 도형이 아무리 복잡해도 공 하나에 O(1). 격자는 도형 정의의 해시를 이름으로 CACHE_DIR에 저장
+"""
+
+CELL = 1.  # 격자 간격 (px)
+PAD = 8  # 격자를 화면 밖으로 늘리는 칸 수 (밀려 나간 공도 조회되도록)
+CACHE_DIR = Path(__file__).parent / 'sdf_cache'  # 실행 위치와 상관없이 이 파일 옆에
+VERSION = 1  # 계산 방법이 바뀌면 올림 (이전 캐시를 안 씀)
+
+Circle = namedtuple('Circle', ['center', 'r'])
+Polygon = namedtuple('Polygon', ['points'])  # 꼭짓점 (x, y) 목록, 자기 교차가 없으면 방향은 상관없음
+# 밝은 픽셀(절반 이상)이 안쪽인 PGM/PPM 그림 (Tk도 그대로 읽을 수 있는 형식)
+# 픽셀 (i, j)의 왼쪽 위 모서리가 origin + (j, i) * scale
+Bitmap = namedtuple('Bitmap', ['path', 'origin', 'scale'], defaults=((0, 0), 1))
+
+
+def read_pnm(path):
+    # 바이너리 PGM(P5)/PPM(P6), 밝기 (높이, 너비) 배열을 0~1로
+    data = Path(path).read_bytes()
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b'#':
+            pos = data.index(b'\n', pos)
+            continue
+        end = pos
+        while not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[pos:end])
+        pos = end
+    magic, width, height, maxval = fields[0], int(fields[1]), int(fields[2]), int(fields[3])
+    if magic not in (b'P5', b'P6') or maxval > 255:
+        raise ValueError(f'{path}: only 8-bit binary PGM/PPM')
+
+    channels = 3 if magic == b'P6' else 1
+    pixels = np.frombuffer(data, np.uint8, width * height * channels, pos + 1)
+    return pixels.reshape(height, width, channels).mean(axis=2) / maxval
+
+def edt(mask):
+    """
+    mask가 True인 가장 가까운 픽셀까지의 거리 (픽셀 단위, 유클리드)
+
+    축마다 f(x) = min_i (f(i) + (x - i)^2)를 행 묶음 단위로 브로드캐스팅해서 두 번 (정확한 값)
+    비용은 픽셀 수 x 한 변 길이지만 캐시되므로 처음 한 번만
+    """
+    big = float(sum(mask.shape)) ** 2
+    f = np.where(mask, 0., big)
+    for axis in (0, 1):
+        f = np.moveaxis(f, axis, -1)
+        x = np.arange(f.shape[-1])
+        sq = (x[:, None] - x[None, :]) ** 2.  # [x, i]
+        res = np.empty_like(f)
+        rows = max(1, (1 << 22) // len(x) ** 2)
+        for s in range(0, len(f), rows):
+            res[s:s + rows] = (f[s:s + rows, None, :] + sq).min(axis=-1)
+        f = np.moveaxis(res, -1, axis)
+    return np.sqrt(f)
+
+def bitmap_distance(shape, pts):
+    # 그림의 픽셀 중심 사이 거리로 구한 부호 있는 거리를 쌍선형 보간
+    inside = read_pnm(shape.path) >= 0.5
+    d = np.where(inside, edt(~inside) - 0.5, 0.5 - edt(inside)) * shape.scale
+    # 그림 밖은 바깥으로: 가장자리에 바깥 픽셀 한 줄을 두름
+    d = np.pad(d, 1, constant_values=-0.5 * shape.scale)
+    ij = (pts - shape.origin) / shape.scale - 0.5 + 1
+    return bilinear(d, ij[..., ::-1])
+
+def polygon_distance(shape, pts):
+    p = np.asarray(shape.points, float)
+    a, b = p, np.roll(p, -1, axis=0)
+    ab = b - a
+    ap = pts[:, None] - a  # [점, 변]
+    t = ((ap * ab).sum(axis=-1) / (ab * ab).sum(axis=-1)).clip(0, 1)
+    d = np.hypot(*np.moveaxis(ap - t[..., None] * ab, -1, 0)).min(axis=1)
+
+    # 짝홀 규칙: 점에서 오른쪽으로 뻗은 반직선이 변을 몇 번 지나는지
+    y = pts[:, 1, None]
+    cross = (a[:, 1] > y) != (b[:, 1] > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = a[:, 0] + (y - a[:, 1]) * ab[:, 0] / ab[:, 1]
+    inside = (cross & (pts[:, 0, None] < x)).sum(axis=1) % 2 == 1
+    return np.where(inside, d, -d)
+
+def distance(shape, pts):
+    # 도형 안쪽이 양수인 부호 있는 거리, pts: (N, 2)
+    if isinstance(shape, Circle):
+        d = pts - shape.center
+        return shape.r - np.hypot(d[:, 0], d[:, 1])
+    if isinstance(shape, Polygon):
+        return polygon_distance(shape, pts)
+    if isinstance(shape, Bitmap):
+        return bitmap_distance(shape, pts)
+    raise TypeError(f'unknown shape {shape!r}')
+
+def bilinear(grid, ij):
+    # grid[i, j]를 실수 좌표 ij (..., 2)에서 보간 (범위 밖은 가장자리 값)
+    h, w = grid.shape
+    i = ij[..., 0].clip(0, h - 1)
+    j = ij[..., 1].clip(0, w - 1)
+    i0 = np.minimum(i.astype(np.intp), h - 2)
+    j0 = np.minimum(j.astype(np.intp), w - 2)
+    fi = i - i0
+    fj = j - j0
+    top = grid[i0, j0] * (1 - fj) + grid[i0, j0 + 1] * fj
+    bottom = grid[i0 + 1, j0] * (1 - fj) + grid[i0 + 1, j0 + 1] * fj
+    return top * (1 - fi) + bottom * fi
+
+
+class Field:
+    """
+    inside와 obstacles로 정한 공간의 phi와 기울기 격자 (phi[i, j]는 점 origin + (j, i) * cell)
+
+    Field.build()는 캐시가 있으면 파일에서 읽고, 없으면 계산해서 저장
+    """
+
+    def __init__(self, phi, grad, origin, cell):
+        self.phi = phi
+        self.grad = grad  # (2, 높이, 너비): x, y 성분
+        self.origin = np.asarray(origin, float)
+        self.cell = cell
+
+    @staticmethod
+    def key(inside, obstacles, size, cell):
+        # 도형 정의와 그림 파일 내용의 해시
+        h = hashlib.sha1(repr((VERSION, inside, obstacles, size, cell)).encode())
+        for shape in (inside,) + tuple(obstacles):
+            if isinstance(shape, Bitmap):
+                h.update(Path(shape.path).read_bytes())
+        return h.hexdigest()[:16]
+
+    @classmethod
+    def compute(cls, inside, obstacles, size, cell):
+        origin = (-PAD * cell, -PAD * cell)
+        w = int(np.ceil(size[0] / cell)) + 2 * PAD + 1
+        h = int(np.ceil(size[1] / cell)) + 2 * PAD + 1
+        y, x = np.mgrid[:h, :w] * cell + np.reshape(origin[::-1], (2, 1, 1))
+        pts = np.stack((x.ravel(), y.ravel()), axis=1)
+
+        phi = distance(inside, pts)
+        for shape in obstacles:
+            phi = np.minimum(phi, -distance(shape, pts))
+        phi = phi.reshape(h, w)
+
+        gy, gx = np.gradient(phi, cell)
+        # 계산한 값과 캐시에서 읽은 값이 같도록 저장할 정밀도로 맞춤
+        return cls(phi.astype(np.float32), np.stack((gx, gy)).astype(np.float32), origin, cell)
+
+    @classmethod
+    def build(cls, inside, obstacles=(), size=(500, 500), cell=CELL, cache=CACHE_DIR):
+        obstacles = tuple(obstacles)
+        path = cache and Path(cache) / f'{cls.key(inside, obstacles, size, cell)}.npz'
+        if path and path.exists():
+            with np.load(path) as f:
+                return cls(f['phi'], f['grad'], f['origin'], float(f['cell']))
+
+        field = cls.compute(inside, obstacles, size, cell)
+        if path:
+            path.parent.mkdir(exist_ok=True)
+            np.savez(path, phi=field.phi, grad=field.grad, origin=field.origin, cell=cell)
+        return field
+
+    @property
+    def digest(self):
+        # 격자 내용의 해시 8바이트 (스냅샷이 같은 용기에서 저장됐는지 확인할 때)
+        h = hashlib.sha1(np.ascontiguousarray(self.phi, np.float32).tobytes())
+        h.update(repr((self.origin.tolist(), float(self.cell))).encode())
+        return h.digest()[:8]
+
+    def lookup(self, pos):
+        # (phi, 기울기 (N, 2))
+        ij = ((pos - self.origin) / self.cell)[..., ::-1]
+        phi = bilinear(self.phi, ij)
+        grad = np.stack((bilinear(self.grad[0], ij), bilinear(self.grad[1], ij)), axis=-1)
+        return phi, grad
+
+    def constrain(self, pos, r, idx=slice(None)):
+        # 벽에서 r보다 가까운 공을 기울기 방향으로 밀어냄 (pos를 바꿈)
+        p = pos[idx]
+        phi, grad = self.lookup(p)
+        hit = phi < r
+        if not hit.any():
+            return
+
+        g = grad[hit]
+        norm = np.hypot(g[:, 0], g[:, 1])
+        norm[norm == 0] = 1
+        p[hit] += g * ((r - phi[hit]) / norm)[:, None]
+        pos[idx] = p
@@ -0,0 +1,107 @@
+import mmap
+import struct
+
+import numpy as np
+
+"""
+Snapshot structure
+
+header: magic 'BSNP', version u8, auto u8, substeps u8, iterations u8,
+        ticks u32, ball_next u32, ball_n u32, n u32, step_cost f64,
+        container 8바이트 (용기 Field.digest, 기본 원이면 0), ball_r f64 (little-endian, 48바이트)
+이후 공 n개의 배열을 차례로 (모두 little-endian, 8바이트 경계에서 시작)
+  pos   f64 (n, 2)
+  pos_b f64 (n, 2)
+  still i32 (n)
+  awake u8  (n)
+
+World는 난수 없이 정해진 순서로만 돌아가므로 (substeps를 고정했을 때)
+스냅샷에서 t 틱 더 돌린 결과는 처음부터 돌린 결과와 비트 단위로 같음
+용기나 공 반지름이 다른 World에는 불러오지 않음
+"""
+
+MAGIC = b'BSNP'
+VERSION = 4  # 형식이나 시뮬레이션 결과가 바뀌면 올림 (2: REORDER_EVERY, 3: container, 4: ball_r)
+HEADER = struct.Struct('<4sBBBBIIIId8sd')
+NO_CONTAINER = bytes(8)
+
+ARRAYS = (('pos', '<f8', (2,)), ('pos_b', '<f8', (2,)), ('still', '<i4', ()), ('awake', 'u1', ()))
+
+
+def container_key(world):
+    return world.field.digest if world.field else NO_CONTAINER
+
+def layout(n):
+    # (필드, dtype, 모양, 시작 위치)
+    offset = HEADER.size
+    res = []
+    for field, dtype, shape in ARRAYS:
+        res.append((field, dtype, (n,) + shape, offset))
+        size = n * np.dtype(dtype).itemsize * int(np.prod(shape))
+        offset += -(-size // 8) * 8
+    return res
+
+def save(world, path):
+    bodies = world.bodies
+    n = bodies.n
+    header = HEADER.pack(MAGIC, VERSION, world.auto, world.substeps, world.iterations,
+                         world.ticks, world.ball_next, world.ball_n, n, world.step_cost,
+                         container_key(world), bodies.r)
+    with open(path, 'wb') as f:
+        f.write(header)
+        for field, dtype, shape, offset in layout(n):
+            f.seek(offset)
+            f.write(getattr(bodies, field)[:n].astype(dtype).tobytes())
+
+def read_header(data):
+    magic, version, auto, substeps, iterations, ticks, ball_next, ball_n, n, step_cost, container, ball_r = \
+        HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not an engine snapshot')
+    return dict(auto=bool(auto), substeps=substeps, iterations=iterations, ticks=ticks,
+                ball_next=ball_next, ball_n=ball_n, n=n, step_cost=step_cost, container=container,
+                ball_r=ball_r)
+
+def restore(world, path):
+    """
+    비어 있는 world에 스냅샷을 불러옴 (공마다 on_spawn을 부름)
+
+    파일을 mmap으로 열어 배열을 bodies로 한 번씩만 복사
+    """
+    if len(world):
+        raise ValueError('restore into an empty world')
+
+    bodies = world.bodies
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header = read_header(data)
+        if header['container'] != container_key(world):
+            raise ValueError('engine snapshot was saved with a different container')
+        if header['ball_r'] != world.bodies.r:
+            raise ValueError(f'engine snapshot has ball_r {header["ball_r"]}, not {world.bodies.r}')
+        n = header['n']
+        end = layout(n)[-1]
+        if len(data) < end[3] + n:
+            raise ValueError(f'engine snapshot truncated: {len(data)} bytes')
+
+        while len(bodies.pos) < n:
+            bodies.grow()
+        for field, dtype, shape, offset in layout(n):
+            src = np.frombuffer(data, dtype, int(np.prod(shape)), offset).reshape(shape)
+            getattr(bodies, field)[:n] = src
+            del src  # mmap을 닫기 전에 버퍼 참조를 놓음
+    bodies.n = n
+    bodies.dirty[:n] = True
+
+    world.auto = header['auto']
+    world.substeps = header['substeps']
+    world.iterations = header['iterations']
+    world.ticks = header['ticks']
+    world.ball_next = header['ball_next']
+    world.ball_n = header['ball_n']
+    world.step_cost = header['step_cost']
+    world.update_sleepers()
+
+    for i in range(n):
+        for f in world.on_spawn:
+            f(world, i)
+    return world
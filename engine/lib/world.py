@@ -0,0 +1,335 @@
+from time import perf_counter
+
+import numpy as np
+
+from lib.vector import Vector
+from lib.grid import Grid
+from lib.bodies import Bodies, MARGIN
+from lib.parallel import ParallelSolver
+from lib import snapshot
+from lib.sdf import Field, Circle, Polygon, Bitmap
+
+
+MSPF = 10  # 물리 틱 간격
+
+# 틱마다 물리 단계(적분, 용기, 충돌) 수. None이면 단계 하나의 비용을 재서 자동으로
+SUBSTEPS = None
+SUBSTEPS_MAX = 8
+ITERATIONS = 1  # 단계마다 충돌 처리 반복 수
+PHYSICS_BUDGET = 0.5  # 자동일 때 틱 간격 중 물리에 쓸 비율
+AUTO_EVERY = 50  # 자동일 때 이 틱마다 단계 수를 다시 정함
+
+G = Vector(0, 0.1)  # 틱당 (단계가 n개면 단계마다 G / n^2)
+GRAVITY = np.array((G.x, G.y))
+
+WIDTH = 500
+HEIGHT = 500
+
+CENTER = Vector(WIDTH / 2, HEIGHT / 2)
+CENTER_XY = np.array((CENTER.x, CENTER.y))
+R = 200
+
+
+BALL_R = 10
+BALL_R2 = BALL_R * 2
+BALL_POS = Vector(400, 200)  # 공이 생기는 위치
+
+BALL_COOLTIME = 20
+BALL_N = 100
+
+# 이 틱마다 공 배열을 칸의 Morton 순서로 다시 정렬 (공간에서 가까운 공이 메모리에서도 가깝게, 0이면 안 함)
+# 정렬하면 충돌 처리 순서가 바뀌므로 정렬하지 않은 실행과 결과가 다름 (결정적이기는 함)
+REORDER_EVERY = 200
+
+# 원 대신 쓸 수 있는 용기 (안쪽 도형, 장애물들), lib/sdf.py
+PEGS = tuple(Circle((x + (y // 30 % 2) * 20., float(y)), 6.)
+             for y in range(270, 400, 30) for x in range(110, 400, 40)
+             if np.hypot(x - CENTER.x, y - CENTER.y) < R - 30)
+CONTAINERS = {
+    'circle': (Circle((CENTER.x, CENTER.y), R), ()),
+    'pegs': (Circle((CENTER.x, CENTER.y), R), PEGS),
+    'cup': (Polygon(((40, 60), (460, 60), (460, 300), (300, 460), (200, 460), (40, 300))), ()),
+}
+
+# 틱당 SLEEP_SPEED보다 느린 틱이 SLEEP_TICKS번 이어진 공은 잠재움 (적분, 용기, 충돌에서 빠짐)
+# 틱당 WAKE_SPEED 이상으로 움직이는 공이 닿으면 다시 깨움
+SLEEP = True
+SLEEP_SPEED = 0.05
+SLEEP_TICKS = 30
+WAKE_SPEED = 0.5
+
+
+def field_of(container):
+    # World의 container 인자를 Field로 (None이면 None)
+    if isinstance(container, str):
+        container = CONTAINERS.get(container) or (Bitmap(container), ())
+    if container is not None and not isinstance(container, Field):
+        container = Field.build(*container, size=(WIDTH, HEIGHT))
+    return container
+
+
+class Ball:
+    """world.bodies의 한 행을 보는 view (상태는 bodies 배열에 있음)"""
+
+    __slots__ = ('world', 'i')
+
+    def __init__(self, world, i):
+        self.world = world
+        self.i = i
+
+    @property
+    def pos(self):
+        return Vector(*self.world.bodies.pos[self.i].tolist())
+
+    @pos.setter
+    def pos(self, pos):
+        self.world.bodies.pos[self.i] = pos.x, pos.y
+
+    @property
+    def pos_b(self):
+        return Vector(*self.world.bodies.pos_b[self.i].tolist())
+
+    @pos_b.setter
+    def pos_b(self, pos):
+        self.world.bodies.pos_b[self.i] = pos.x, pos.y
+
+    @property
+    def id(self):
+        return int(self.world.bodies.ids[self.i])
+
+
+class World:
+    """
+    화면 없이 돌아가는 공 시뮬레이션 (공 배열, 중력, 용기, 공 생성 일정)
+
+    step(n)으로 n 틱을 한 번에 진행. 렌더러는 콜백을 등록해서 따라옴
+    on_spawn(world, i): 공이 생길 때 (캔버스 항목을 만들고 bodies.ids[i]에 저장)
+    on_step(world): step() 호출이 끝날 때 (틱마다가 아니라 step 한 번마다)
+    on_reorder(world, order): 공 배열을 다시 정렬했을 때 (새 i번째 = 이전 order[i]번째)
+    bodies.ids는 행과 함께 옮겨지므로 번호로 가리키는 다른 것이 있을 때만 필요
+
+    substeps=None이면 단계 하나의 시간을 재서 자동으로 정함 (결과가 실행마다 달라질 수 있음)
+    save(path)/restore(path)로 상태를 저장하고 불러옴. substeps를 고정하면 같은 상태에서
+    같은 틱 수를 돌린 결과가 비트 단위로 같음 (lib/snapshot.py)
+    workers > 0이면 충돌 처리를 lib/parallel.py의 프로세스들로, 다 쓰면 close()
+
+    ball_r, ball_cooltime, ball_v: 공 반지름, 공 생성 간격 (틱), 새 공의 틱당 초기 속도
+    (공 수천 개로 늘려 볼 때는 headless.py --scaled처럼 작은 공을 빨리 옆으로 보내며 만듦)
+    container: 원 대신 쓸 용기 (CONTAINERS의 이름, PGM/PPM 그림 경로, (안쪽 도형, 장애물들) 또는 Field)
+    주지 않으면 CENTER, R - ball_r의 원으로 정확히 계산
+
+    sleep=True이면 멈춘 공을 재움. 잠든 공은 sleep_grid에 따로 두고 잠든 공이 바뀔 때만 다시 만듦
+    단계마다 격자는 깨어 있는 공으로만 만들고 잠든 공과의 쌍은 sleep_grid에서 찾으므로
+    쌓인 공이 다 잠들면 단계 비용은 깨어 있는 공 수에 비례
+    """
+
+    def __init__(self, ball_n=BALL_N, substeps=SUBSTEPS, iterations=ITERATIONS,
+                 workers=0, broadphase=True, sleep=SLEEP, container=None, reorder=REORDER_EVERY,
+                 ball_r=BALL_R, ball_cooltime=BALL_COOLTIME, ball_v=Vector(0, 0)):
+        self.on_spawn = []
+        self.on_step = []
+        self.on_reorder = []
+        self.reorder_every = reorder
+
+        # 충돌 처리 도중 밀려서 새로 겹치는 쌍까지 후보에 들도록 공 지름보다 조금 크게
+        cell = ball_r * 2 * MARGIN
+        self.bodies = Bodies(ball_r)
+        self.grid = Grid(cell)
+        self.solver = ParallelSolver(ball_r, cell, workers, ball_n) if workers else None
+        self.broadphase = broadphase
+
+        self.sleep = sleep
+        self.sleep_grid = Grid(cell)
+        self.sleepers = np.empty(0, np.intp)
+
+        self.gravity = GRAVITY
+        self.center = CENTER_XY
+        self.r = R - ball_r
+
+        self.field = field_of(container)
+
+        self.ball_n = ball_n
+        self.ball_next = 0
+        self.ball_cooltime = ball_cooltime  # 0이면 새 공을 만들지 않음
+        self.ball_v = ball_v
+
+        self.auto = substeps is None
+        self.substeps = substeps or 1
+        self.iterations = iterations
+        self.step_cost = 0.  # 단계 하나의 평균 시간 (초)
+        self.auto_budget = MSPF / 1000 * PHYSICS_BUDGET  # 자동일 때 틱 하나의 물리 시간 목표 (초)
+
+        self.ticks = 0
+
+    def close(self):
+        if self.solver:
+            self.solver.close()
+            self.solver = None
+
+    def __len__(self):
+        return self.bodies.n
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.bodies.n:
+            raise IndexError(i)
+        return Ball(self, i)
+
+    def __iter__(self):
+        return (Ball(self, i) for i in range(self.bodies.n))
+
+    def spawn(self, pos=BALL_POS, v=None):
+        # Verlet의 이전 위치는 한 단계 전이므로 단계당 속도로
+        v = (self.ball_v if v is None else v) * (1 / self.substeps)
+        i = self.bodies.add((pos.x, pos.y), (pos.x - v.x, pos.y - v.y))
+        for f in self.on_spawn:
+            f(self, i)
+        return i
+
+    @property
+    def awake(self):
+        return self.bodies.n - len(self.sleepers)
+
+    @property
+    def asleep(self):
+        return len(self.sleepers)
+
+    def sleeper_pairs(self, active):
+        # (깨어 있는 공, 주변의 잠든 공) 쌍
+        i, j = self.sleep_grid.pairs_with(self.bodies.pos[active])
+        return active[i], self.sleepers[j]
+
+    def candidate_pairs(self, active=None):
+        bodies = self.bodies
+        if not self.broadphase:
+            i, j = np.triu_indices(bodies.n, 1)
+            return i, j
+
+        # 격자 칸 크기가 BALL_R2 이상이므로 겹친 쌍은 같은 칸이나 이웃 칸에 있음
+        if active is None:
+            self.grid.rebuild(bodies.pos[:bodies.n])
+            return self.grid.pairs()
+
+        self.grid.rebuild(bodies.pos[active])
+        a, b = self.grid.pairs()
+        c, d = self.sleeper_pairs(active)
+        return np.concatenate((active[a], c)), np.concatenate((active[b], d))
+
+    def substep(self):
+        bodies = self.bodies
+        active = None
+        if len(self.sleepers):
+            active = bodies.active()
+            if not len(active):
+                return
+
+        idx = slice(None) if active is None else active
+        bodies.integrate(self.gravity / self.substeps**2, idx)
+        if self.field:
+            self.field.constrain(bodies.pos[:bodies.n], bodies.r, idx)
+        else:
+            bodies.constrain(self.center, self.r, idx)
+
+        a, b = self.candidate_pairs(active)
+        for _ in range(self.iterations):
+            if self.solver:
+                self.solver.solve(bodies, a, b)
+            else:
+                bodies.solve(a, b)
+
+    def settings(self):
+        # 품질 조절에 쓰는 매개변수의 현재 값 (set으로 되돌릴 수 있는 형태)
+        return dict(substeps=None if self.auto else self.substeps, iterations=self.iterations,
+                    ball_cooltime=self.ball_cooltime)
+
+    def set(self, **params):
+        # 돌리는 도중 바꿀 수 있는 매개변수 (substeps=None이면 자동으로)
+        for name, value in params.items():
+            if name == 'substeps':
+                self.auto = value is None
+                if value:
+                    self.set_substeps(value)
+            elif name == 'sleep':
+                self.sleep = value
+                if not value:
+                    # 더 이상 재우지도 깨우지도 않으므로 잠든 공을 모두 깨움
+                    n = self.bodies.n
+                    self.bodies.awake[:n] = True
+                    self.bodies.still[:n] = 0
+                    self.update_sleepers()
+            elif name in ('iterations', 'ball_n', 'ball_cooltime', 'auto_budget'):
+                setattr(self, name, value)
+            else:
+                raise ValueError(f'unknown parameter {name}')
+
+    def set_substeps(self, n):
+        # 단계 길이가 바뀌므로 단계당 이동량(pos - pos_b)을 맞춰서 속도를 유지
+        self.bodies.rescale(self.substeps / n)
+        self.substeps = n
+
+    def settle(self):
+        # 멈춘 공을 재우고, 빠르게 움직이는 공과 닿은 잠든 공을 깨움
+        bodies = self.bodies
+        fall = bodies.sleep(SLEEP_SPEED / self.substeps, SLEEP_TICKS)
+        woken = np.empty(0, np.intp)
+        if len(self.sleepers):
+            active = bodies.active()
+            woken = bodies.wake(*self.sleeper_pairs(active), WAKE_SPEED / self.substeps)
+
+        if len(fall) or len(woken):
+            self.update_sleepers()
+
+    def update_sleepers(self):
+        bodies = self.bodies
+        self.sleepers = np.flatnonzero(~bodies.awake[:bodies.n])
+        self.sleep_grid.rebuild(bodies.pos[self.sleepers])
+
+    def reorder(self):
+        # 칸의 Morton 키 순서로 (같은 칸 안에서는 이전 순서대로)
+        bodies = self.bodies
+        order = np.argsort(self.grid.morton(bodies.pos[:bodies.n]), kind='stable')
+        bodies.permute(order)
+        self.update_sleepers()
+        for f in self.on_reorder:
+            f(self, order)
+
+    def save(self, path):
+        snapshot.save(self, path)
+
+    def restore(self, path):
+        # 비어 있는 World에만 (lib/snapshot.py)
+        return snapshot.restore(self, path)
+
+    def auto_substeps(self):
+        # 물리가 auto_budget 안에 들어가는 최대 단계 수
+        n = int(self.auto_budget / max(self.step_cost, 1e-6))
+        n = max(1, min(n, SUBSTEPS_MAX))
+        if n != self.substeps:
+            self.set_substeps(n)
+
+    def tick(self):
+        start = perf_counter()
+        for _ in range(self.substeps):
+            self.substep()
+        self.step_cost += ((perf_counter() - start) / self.substeps - self.step_cost) * 0.1
+        self.ticks += 1
+
+        if self.sleep and self.broadphase:
+            self.settle()
+
+        if self.bodies.n < self.ball_n and self.ball_cooltime:
+            self.ball_next -= 1
+            if self.ball_next <= 0:
+                self.ball_next = self.ball_cooltime
+                self.spawn()
+
+        if self.reorder_every and not self.ticks % self.reorder_every:
+            self.reorder()
+
+        if self.auto and not self.ticks % AUTO_EVERY:
+            self.auto_substeps()
+
+    def step(self, n=1):
+        for _ in range(n):
+            self.tick()
+        for f in self.on_step:
+            f(self)
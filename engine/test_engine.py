@@ -0,0 +1,18 @@
+from headless import governed_step
+from lib.governor import Governor
+from lib.world import World, BALL_N, BALL_COOLTIME, MSPF, PHYSICS_BUDGET
+
+
+def test_governor_with_auto_substeps_spawns_every_ball():
+    # 자동 단계 수가 예산을 다 채워도 governor가 공 생성을 멈추지 않아야 함
+    world = World(substeps=None)
+    governor = Governor(MSPF / 1000 * PHYSICS_BUDGET, float('inf'), world.settings(),
+                        lambda setting: world.set(**setting))
+    world.set(auto_budget=governor.auto_budget)
+    try:
+        governed_step(world, governor, BALL_N * BALL_COOLTIME + 100)
+    finally:
+        world.close()
+
+    assert len(world) == BALL_N
+    assert not [e for e in governor.timeline if e.new['ball_cooltime'] == 0]